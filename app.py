@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, jsonify, request, send_from_directory, Response, g, has_request_context, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 import datetime
 from datetime import timedelta
@@ -8,21 +8,50 @@ from geopy.distance import geodesic
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from pytz import timezone
-from deap import base, creator, tools, algorithms
+from deap import base, creator, tools
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPoolExecutor
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 import random
+import math
+import heapq
+import itertools
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import pytz
 import logging
 import os
+import sys
+import socket
+import uuid
+import base64
+import json
+import hashlib
+import functools
+from collections import namedtuple, Counter, OrderedDict
+from operator import attrgetter
 from werkzeug.utils import secure_filename
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import desc, or_, and_
+from sqlalchemy.engine import Engine
 from flask_cors import CORS
 
 
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])
 
 UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
@@ -32,10 +61,83 @@ if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 
 #Configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql://root:''@localhost/flask'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'mysql://root:''@localhost/flask')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = '897DB6FA36B77A3DEF1CB2D932F38097DE54DDA02D8D70B6657D51503AD92BFF'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Cache of hot GET responses: 'memory' (per process), 'redis' (shared through the server
+# at RESPONSE_CACHE_URL, needed when allocation workers run in other processes) or None.
+# Entries live RESPONSE_CACHE_TTL seconds; the memory backend keeps at most
+# RESPONSE_CACHE_MAX_ENTRIES, a Redis server evicts by its own maxmemory policy.
+app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+app.config['RESPONSE_CACHE_URL'] = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+app.config['RESPONSE_CACHE_TTL'] = 60
+app.config['RESPONSE_CACHE_MAX_ENTRIES'] = 1024
+# Streamed responses are cached only while their body stays within this many bytes
+app.config['RESPONSE_CACHE_MAX_BODY'] = 1024 * 1024
+# Stream list responses as they are serialized, reading STREAM_BATCH_SIZE rows at a
+# time from a server-side cursor, instead of building the whole JSON array in memory
+app.config['STREAM_LIST_RESPONSES'] = True
+app.config['STREAM_BATCH_SIZE'] = 500
+# Largest page size accepted by paginated endpoints (?limit=)
+app.config['MAX_PAGE_SIZE'] = 100
+# Radius of the nearby listings shown to public users
+app.config['NEARBY_RADIUS_KM'] = 5
+# Largest radius accepted through ?radius=, larger ones are capped to it
+app.config['MAX_RADIUS_KM'] = 50
+# Re-measure listings right at the edge of the radius with the exact geodesic
+app.config['NEARBY_GEODESIC_REFINEMENT'] = False
+# Serve nearby listings from the in-memory spatial index, reloaded every LISTING_INDEX_REFRESH seconds
+app.config['LISTING_INDEX_ENABLED'] = True
+app.config['LISTING_INDEX_REFRESH'] = 300
+# The index can still hold listings closed since it was loaded, so a k-nearest query
+# takes k times this many candidates from it before dropping the inactive ones
+app.config['NEARBY_INDEX_OVERFETCH'] = 2
+# Public users counted as expected demand around a listing, from an index reloaded
+# every PUBLIC_USER_INDEX_REFRESH seconds
+app.config['DEMAND_RADIUS_KM'] = 5
+app.config['PUBLIC_USER_INDEX_REFRESH'] = 300
+# Database holding the scheduled allocation jobs
+app.config['SCHEDULER_JOBSTORE_URL'] = app.config['SQLALCHEMY_DATABASE_URI']
+# Allocation engine used when a listing closes: 'topk' (exact), 'ga', 'ga_numpy' or 'ga_islands'
+app.config['ALLOCATION_ENGINE'] = 'topk'
+# GA runs stop after this many generations without improvement or this many seconds
+app.config['GA_STALL_GENERATIONS'] = 50
+app.config['GA_TIME_BUDGET'] = 30
+# Share of the initial GA population seeded from the greedy allocation
+app.config['GA_SEED_RATIO'] = 0.2
+# Island-model GA: sub-populations, generations between migrations and migrants per island
+app.config['GA_ISLANDS'] = 4
+app.config['GA_MIGRATION_INTERVAL'] = 10
+app.config['GA_MIGRANTS'] = 2
+# Scheduler threads available to run listing allocations concurrently
+app.config['ALLOCATION_THREADS'] = 10
+# Run the GA engines in a process pool ('process') or on the scheduler thread ('thread');
+# ALLOCATION_PROCESSES of None uses every core. The exact 'topk' engine always runs in-thread.
+app.config['ALLOCATION_BACKEND'] = 'process'
+app.config['ALLOCATION_PROCESSES'] = None
+# 'listing' allocates every listing on its own, 'batch' jointly allocates all listings
+# closing within the same BATCH_ALLOCATION_WINDOW minutes, with each user winning at
+# most BATCH_USER_CAP of them and priority reduced by BATCH_DISTANCE_PENALTY per km
+app.config['ALLOCATION_MODE'] = 'listing'
+app.config['BATCH_ALLOCATION_WINDOW'] = 60
+app.config['BATCH_USER_CAP'] = 1
+app.config['BATCH_DISTANCE_PENALTY'] = 0.5
+# Allocation jobs missed by more than ALLOCATION_MISFIRE_GRACE seconds are left to the
+# catch-up sweep, which runs every ALLOCATION_CATCHUP_INTERVAL minutes and allocates at
+# most ALLOCATION_CATCHUP_CONCURRENCY listings at a time
+app.config['ALLOCATION_MISFIRE_GRACE'] = 300
+app.config['ALLOCATION_CATCHUP_INTERVAL'] = 10
+app.config['ALLOCATION_CATCHUP_CONCURRENCY'] = 2
+# A worker's claim on a listing expires after ALLOCATION_LEASE_SECONDS, so listings of a
+# crashed worker are reclaimed; standalone workers poll for due listings every
+# ALLOCATION_WORKER_POLL_INTERVAL seconds and allocate up to ALLOCATION_WORKER_CONCURRENCY at once
+# The lease is not renewed while a listing is allocated, so ALLOCATION_LEASE_SECONDS must
+# exceed the worst-case wait for a pool or worker slot plus the solve time (GA_TIME_BUDGET);
+# a worker whose lease ran out has its results discarded.
+app.config['ALLOCATION_LEASE_SECONDS'] = 600
+app.config['ALLOCATION_WORKER_POLL_INTERVAL'] = 30
+app.config['ALLOCATION_WORKER_CONCURRENCY'] = 2
 
 
 #Initialization
@@ -61,10 +163,20 @@ class Listing(db.Model):
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
     picture_url = db.Column(db.String(200), nullable=True)  
     resource_type = db.Column(db.String(200))
+    # Worker currently allocating the listing and when its claim runs out
+    allocation_owner = db.Column(db.String(100), nullable=True)
+    allocation_lease_expires = db.Column(db.DateTime, nullable=True)
 
 
     organization = db.relationship('Organization', backref=db.backref('listings', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_listings_status_distribution_date', 'status', 'distribution_date'),
+        db.Index('ix_listings_status_location', 'status', 'location_lat', 'location_lon'),
+        db.Index('ix_listings_distribution_date_id', 'distribution_date', 'id'),
+        db.Index('ix_listings_organization_distribution_date', 'organization_id', 'distribution_date', 'id'),
+    )
+
     def __init__(self, organization_id, quantity, distribution_date, location_lat, location_lon, location_name,resource_type, picture_url=None):
         self.organization_id = organization_id
         self.quantity = quantity
@@ -111,6 +223,14 @@ class Request(db.Model):
     listing = db.relationship('Listing', backref=db.backref('requests', lazy=True))
     user = db.relationship('PublicUser', backref=db.backref('requests', lazy=True))
 
+    # Requests are looked up by listing and user, by listing and status (allocation)
+    # and by user and status (a user's requested listings, last accepted request)
+    __table_args__ = (
+        db.Index('ix_requests_listing_user', 'listing_id', 'user_id'),
+        db.Index('ix_requests_listing_status', 'listing_id', 'status'),
+        db.Index('ix_requests_user_status', 'user_id', 'status'),
+    )
+
     def __init__(self, listing_id, user_id):
         self.listing_id = listing_id
         self.user_id = user_id
@@ -206,6 +326,10 @@ class Articles(db.Model):
 
     user = db.relationship('User', backref=db.backref('articles', lazy=True))
 
+    __table_args__ = (
+        db.Index('ix_articles_date_id', 'date', 'id'),
+    )
+
     def __init__(self, title, body, user_id, picture_url=None):
         self.title = title
         self.body = body        
@@ -233,6 +357,313 @@ article_schema = ArticleSchema()
 articles_schema = ArticleSchema(many=True)
 
 
+### Metrics
+
+# Histogram with cumulative buckets, rendered in the Prometheus text format
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250, 500, 1000)
+REQUESTER_BUCKETS = (10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+# Metric name -> (type, help, {label values: Histogram or number})
+metrics = {
+    'http_request_duration_seconds': ('histogram', 'Request latency by endpoint', {}),
+    'http_request_sql_statements': ('histogram', 'SQL statements executed per request by endpoint', {}),
+    'allocation_phase_duration_seconds': ('histogram', 'Allocation phase durations (load, score, solve, persist)', {}),
+    'allocation_requesters': ('histogram', 'Pending requesters per allocated listing', {}),
+    'allocations_total': ('counter', 'Listings allocated by engine', {}),
+    'allocation_generations_total': ('counter', 'GA generations run by engine', {}),
+    'allocation_last_fitness': ('gauge', 'Fitness of the latest allocation by engine', {}),
+    'response_cache_requests_total': ('counter', 'Cacheable requests by endpoint and cache hit or miss', {}),
+}
+METRIC_LABELS = {
+    'http_request_duration_seconds': ('endpoint', 'method', 'status'),
+    'http_request_sql_statements': ('endpoint', 'method'),
+    'allocation_phase_duration_seconds': ('phase',),
+    'allocation_requesters': ('engine',),
+    'allocations_total': ('engine',),
+    'allocation_generations_total': ('engine',),
+    'allocation_last_fitness': ('engine',),
+    'response_cache_requests_total': ('endpoint', 'result'),
+}
+metrics_lock = threading.Lock()
+
+def observe(name, labels, value, buckets=LATENCY_BUCKETS):
+    with metrics_lock:
+        series = metrics[name][2]
+        if labels not in series:
+            series[labels] = Histogram(buckets)
+        series[labels].observe(value)
+
+def increment(name, labels, value=1):
+    with metrics_lock:
+        series = metrics[name][2]
+        series[labels] = series.get(labels, 0) + value
+
+def set_gauge(name, labels, value):
+    with metrics_lock:
+        metrics[name][2][labels] = value
+
+# Record the timings of an allocation, keyed by phase
+def record_allocation_phases(timings):
+    for phase, seconds in timings.items():
+        observe('allocation_phase_duration_seconds', (phase,), seconds)
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+def render_metrics():
+    lines = []
+    with metrics_lock:
+        for name, (kind, description, series) in metrics.items():
+            full_name = f'runrelief_{name}'
+            lines.append(f'# HELP {full_name} {description}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            for labels, value in sorted(series.items()):
+                if kind == 'histogram':
+                    for bound, count in zip(value.buckets, value.counts):
+                        lines.append(f"{full_name}_bucket{format_labels(METRIC_LABELS[name], labels, [('le', bound)])} {count}")
+                    lines.append(f"{full_name}_bucket{format_labels(METRIC_LABELS[name], labels, [('le', '+Inf')])} {value.count}")
+                    lines.append(f"{full_name}_sum{format_labels(METRIC_LABELS[name], labels)} {value.sum}")
+                    lines.append(f"{full_name}_count{format_labels(METRIC_LABELS[name], labels)} {value.count}")
+                else:
+                    lines.append(f"{full_name}{format_labels(METRIC_LABELS[name], labels)} {value}")
+    return lines
+
+# Count the SQL statements each request executes
+@db.event.listens_for(Engine, 'before_cursor_execute')
+def count_sql_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_statements = g.get('sql_statements', 0) + 1
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.sql_statements = 0
+
+@app.after_request
+def record_request_metrics(response):
+    if 'request_started' in g:
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        # Streamed bodies run their queries while being sent, the same g keeps counting them
+        request_g = g._get_current_object()
+
+        def record():
+            observe('http_request_duration_seconds', (endpoint, method, response.status_code),
+                    time.perf_counter() - request_g.request_started)
+            observe('http_request_sql_statements', (endpoint, method), request_g.sql_statements, STATEMENT_BUCKETS)
+
+        # A streamed response is measured once it has been sent and closed
+        if response.is_streamed:
+            response.call_on_close(record)
+        else:
+            record()
+    return response
+
+# Prometheus metrics, including the live allocation backlog for alerting
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    now = datetime.datetime.now()
+    backlog, oldest = db.session.query(db.func.count(Listing.id), db.func.min(Listing.distribution_date)) \
+        .filter(claimable_listings(now), Listing.distribution_date <= now + timedelta(hours=24)).one()
+    lag = (now - (oldest - timedelta(hours=24))).total_seconds() if oldest else 0
+
+    lines = render_metrics()
+    lines += [
+        '# HELP runrelief_allocation_backlog Listings past their cutoff and not yet allocated',
+        '# TYPE runrelief_allocation_backlog gauge',
+        f'runrelief_allocation_backlog {backlog}',
+        '# HELP runrelief_allocation_lag_seconds Time since the oldest unallocated cutoff passed',
+        '# TYPE runrelief_allocation_lag_seconds gauge',
+        f'runrelief_allocation_lag_seconds {lag}',
+    ]
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+### Response cache
+# Cached responses are tagged with groups ('listings', 'listing:<id>', ...) and writes
+# evict whole groups once they commit, so a cached page is never older than the last
+# committed change to what it shows (or RESPONSE_CACHE_TTL, for changes made elsewhere).
+
+# In-process LRU cache with per-entry expiry
+class MemoryCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (expires, groups, value)
+        self.groups = {}  # group -> keys
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self.drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key, value, ttl, groups):
+        with self.lock:
+            self.drop(key)
+            self.entries[key] = (time.monotonic() + ttl, groups, value)
+            for group in groups:
+                self.groups.setdefault(group, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                self.drop(next(iter(self.entries)))
+
+    def evict(self, groups):
+        with self.lock:
+            for group in groups:
+                for key in list(self.groups.get(group, ())):
+                    self.drop(key)
+
+    # Remove an entry and its group memberships, with the lock held
+    def drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for group in entry[1]:
+            keys = self.groups.get(group)
+            keys.discard(key)
+            if not keys:
+                del self.groups[group]
+
+# Cache kept in Redis or any server speaking its protocol. Values are stored as JSON
+# and every group is a set of its keys.
+class RedisCache:
+    def __init__(self, client, prefix='runrelief:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl, groups):
+        pipeline = self.client.pipeline()
+        pipeline.set(self.prefix + key, json.dumps(value), ex=ttl)
+        for group in groups:
+            pipeline.sadd(self.prefix + 'group:' + group, self.prefix + key)
+            pipeline.expire(self.prefix + 'group:' + group, ttl)
+        pipeline.execute()
+
+    def evict(self, groups):
+        for group in groups:
+            group_key = self.prefix + 'group:' + group
+            self.client.delete(group_key, *self.client.smembers(group_key))
+
+response_cache = None
+response_cache_lock = threading.Lock()
+
+# The configured response cache, created on first use (None when caching is disabled)
+def get_response_cache():
+    global response_cache
+    with response_cache_lock:
+        if response_cache is None and app.config['RESPONSE_CACHE_BACKEND'] == 'memory':
+            response_cache = MemoryCache(app.config['RESPONSE_CACHE_MAX_ENTRIES'])
+        elif response_cache is None and app.config['RESPONSE_CACHE_BACKEND'] == 'redis':
+            import redis
+            response_cache = RedisCache(redis.Redis.from_url(app.config['RESPONSE_CACHE_URL']))
+        return response_cache
+
+# Serve a GET route from the response cache, tagging what it caches with the given
+# groups (formatted with the route's arguments). Only 200 responses are cached. Every
+# response except a streamed miss carries an ETag, and requests whose If-None-Match
+# matches get a 304.
+def cached_response(*groups):
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**kwargs):
+            cache = get_response_cache()
+            # Picture URLs embed the host, so it is part of the key
+            key = 'response:' + request.host_url + request.full_path
+            entry = cache.get(key) if cache else None
+            increment('response_cache_requests_total', (request.endpoint, 'hit' if entry else 'miss'))
+
+            if entry is None:
+                response = app.make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+                if response.is_streamed:
+                    # Cached once fully sent; this response goes out without an ETag
+                    if cache:
+                        response.response = cache_streamed_body(response.response, response, cache, key,
+                                                                [group.format(**kwargs) for group in groups])
+                    return response
+                entry = cache_entry(response, response.get_data(as_text=True))
+                if cache:
+                    cache.set(key, entry, app.config['RESPONSE_CACHE_TTL'], [group.format(**kwargs) for group in groups])
+
+            response = Response(entry['body'], mimetype=entry['mimetype'], headers=entry['headers'])
+            response.set_etag(entry['etag'])
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+# Cache entry of a response with the given body
+def cache_entry(response, body):
+    return {
+        'body': body,
+        'mimetype': response.mimetype,
+        'headers': {name: value for name, value in response.headers.items() if name.startswith('X-')},
+        'etag': hashlib.sha1(body.encode('utf-8')).hexdigest()
+    }
+
+# Pass the streamed body of a response through, caching it at the end unless it grew
+# past RESPONSE_CACHE_MAX_BODY
+def cache_streamed_body(body, response, cache, key, groups):
+    ttl, max_body = app.config['RESPONSE_CACHE_TTL'], app.config['RESPONSE_CACHE_MAX_BODY']
+    chunks, size = [], 0
+    try:
+        for chunk in body:
+            if chunks is not None:
+                size += len(chunk)
+                if size <= max_body:
+                    chunks.append(chunk)
+                else:
+                    chunks = None
+            yield chunk
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    if chunks is not None:
+        cache.set(key, cache_entry(response, b''.join(chunks).decode('utf-8')), ttl, groups)
+
+# Evict the cached responses of the given groups once the current transaction commits
+def invalidate_responses(*groups):
+    db.session.info.setdefault('invalidated_responses', set()).update(groups)
+
+@db.event.listens_for(Session, 'after_commit')
+def evict_invalidated_responses(session):
+    groups = session.info.pop('invalidated_responses', None)
+    cache = get_response_cache() if groups else None
+    if cache:
+        cache.evict(groups)
+
+@db.event.listens_for(Session, 'after_rollback')
+def discard_invalidated_responses(session):
+    session.info.pop('invalidated_responses', None)
+
+
 #Profile Routes
 @app.route('/register', methods=['POST'])
 def register():
@@ -272,6 +703,8 @@ def register():
 
         db.session.add(new_user)
         db.session.commit()
+        if user_type == 'public_user':
+            public_user_index.add(new_user.id, new_user.location_lat, new_user.location_lon)
         return jsonify({'message': 'User registered successfully'}), 201
     except IntegrityError:
         db.session.rollback()
@@ -368,6 +801,8 @@ def update_profile(user_type, user_id):
         user.oku_card_holder = data.get('oku_card_holder', user.oku_card_holder)
 
     db.session.commit()
+    if user_type == 'public_user':
+        public_user_index.add(user.id, user.location_lat, user.location_lon)
     return jsonify({'message': 'Profile updated successfully'}), 200
 
 @app.route('/document/<user_type>/<user_id>', methods=['POST'])
@@ -505,16 +940,132 @@ def unverified_public():
 
 
 
+### Pagination
+# Keyset pagination: rows are ordered by (date, id) and a page starts right after the
+# sort key of the previous page's last row, so every page costs one index range scan
+# however deep it is. The cursor is that sort key, base64-encoded so clients treat it
+# as opaque. Responses stay plain arrays; the next page's cursor, if there is one, is
+# sent in the X-Next-Cursor header.
+
+def encode_cursor(date, id):
+    payload = json.dumps([date.isoformat() if date is not None else None, id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+# Sort key of a cursor, raising ValueError when the cursor is malformed
+def decode_cursor(cursor):
+    try:
+        date, id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (datetime.datetime.fromisoformat(date) if date else None), int(id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+# Page size and cursor requested through ?limit= and ?cursor=. Without a limit the
+# whole result is returned, as before pagination existed.
+def page_args():
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = min(max(limit, 1), app.config['MAX_PAGE_SIZE'])
+    return limit, request.args.get('cursor')
+
+# Ordering of a nullable date column with NULL dates before every date, so after them
+# when descending. MySQL has no NULLS FIRST/LAST but already sorts NULLs that way.
+def date_ordering(date_column, descending=False):
+    ordering = desc(date_column) if descending else date_column.asc()
+    if db.engine.dialect.name == 'mysql':
+        return ordering
+    return ordering.nulls_last() if descending else ordering.nulls_first()
+
+# One page of a query ordered by (date_column, id_column), ascending or descending,
+# and the cursor of the next page (None on the last one)
+def keyset_page(query, date_column, id_column, limit=None, cursor=None, descending=False):
+    if cursor:
+        date, id = decode_cursor(cursor)
+        # NULL dates come before every date, and comparisons with NULL match nothing
+        if date is None and descending:
+            query = query.filter(date_column.is_(None), id_column < id)
+        elif date is None:
+            query = query.filter(or_(date_column.isnot(None), and_(date_column.is_(None), id_column > id)))
+        elif descending:
+            query = query.filter(or_(date_column < date, and_(date_column == date, id_column < id),
+                                     date_column.is_(None)))
+        else:
+            query = query.filter(or_(date_column > date, and_(date_column == date, id_column > id)))
+
+    if descending:
+        query = query.order_by(date_ordering(date_column, descending=True), desc(id_column))
+    else:
+        query = query.order_by(date_ordering(date_column), id_column)
+
+    # Without a limit the rows are read lazily, a batch at a time
+    if limit is None:
+        return query.yield_per(app.config['STREAM_BATCH_SIZE']), None
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(getattr(last, date_column.key), getattr(last, id_column.key))
+
+# JSON array response carrying the next page's cursor
+def paged_response(items, next_cursor):
+    response = json_array_response(items) if app.config['STREAM_LIST_RESPONSES'] else jsonify(list(items))
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+### Streaming JSON
+# JSON encoding of one value, with orjson when it is installed. Datetimes keep the
+# HTTP-date format jsonify gives them, which the mobile clients parse.
+def encode_json(value):
+    if orjson is not None:
+        return orjson.dumps(value, default=app.json.default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS)
+    return app.json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+# Response streaming a JSON array of items as they are produced, written out in chunks
+# of about 64 KB, so a request never holds the whole array or its serialization
+def json_array_response(items):
+    def generate():
+        chunk = bytearray(b'[')
+        for i, item in enumerate(items):
+            if i:
+                chunk += b','
+            chunk += encode_json(item)
+            if len(chunk) >= 65536:
+                yield bytes(chunk)
+                chunk.clear()
+        chunk += b']'
+        yield bytes(chunk)
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+# First item of an iterable (None when it is empty) and an iterator over all its items
+def peek(items):
+    items = iter(items)
+    first = next(items, None)
+    if first is None:
+        return None, items
+    return first, itertools.chain([first], items)
+
+
 ###### Resources 
 
 ### Resources Functions
 # Malaysia pytz
 malaysia = timezone('Asia/Singapore')
 
-# Retrieve all listings
-def get_all_listings():
-    listings = Listing.query.order_by(Listing.distribution_date).all()
-    return listings
+# Columns of listing responses. The organization name is joined into the same SELECT
+# rather than lazily loaded through Organization -> User once per listing.
+LISTING_RESPONSE_COLUMNS = (Listing.id, Listing.organization_id, User.name.label('organization_name'),
+                            Listing.quantity, Listing.distribution_date, Listing.location_name,
+                            Listing.resource_type, Listing.status, Listing.picture_url)
+
+# Query for listing response rows, with any extra columns after the response columns
+def listing_rows(*columns):
+    return db.session.query(*LISTING_RESPONSE_COLUMNS, *columns).join(User, User.id == Listing.organization_id)
+
+# Retrieve all listings, a page at a time when a limit is given
+def get_all_listings(limit=None, cursor=None):
+    return keyset_page(listing_rows(), Listing.distribution_date, Listing.id, limit, cursor)
 
 
 
@@ -525,9 +1076,9 @@ def get_all_listings():
 #     return [listing.to_dict() for listing in query.all()]
 
 # Retrieve listings by status
-def get_listings_by_status(status):
-    listings = Listing.query.filter_by(status=status).order_by(Listing.distribution_date).all()
-    return listings
+def get_listings_by_status(status, limit=None, cursor=None):
+    return keyset_page(listing_rows().filter(Listing.status == status),
+                       Listing.distribution_date, Listing.id, limit, cursor)
 
 # Retrieve active listings
 def get_active_listings():
@@ -535,24 +1086,275 @@ def get_active_listings():
     return listings
 
 # Retrieve listings filtered by organization ID
-def get_listings_by_organization(organization_id):
-    return Listing.query.filter_by(organization_id=organization_id).order_by(Listing.distribution_date).all()
+def get_listings_by_organization(organization_id, limit=None, cursor=None):
+    return keyset_page(listing_rows().filter(Listing.organization_id == organization_id),
+                       Listing.distribution_date, Listing.id, limit, cursor)
 
 # Retrieve listings filtered by organization ID & status
-def get_listings_by_organization_and_status(organization_id, status):
-    listings = Listing.query.filter_by(organization_id=organization_id, status=status).order_by(Listing.distribution_date).all()
-    return listings
+def get_listings_by_organization_and_status(organization_id, status, limit=None, cursor=None):
+    return keyset_page(listing_rows().filter(Listing.organization_id == organization_id, Listing.status == status),
+                       Listing.distribution_date, Listing.id, limit, cursor)
 
 # Calculate distance for nearby listings
 def calculate_distance(location1, location2):
     # Calculate distance between two locations
     return geodesic(location1, location2).kilometers
 
+# Mean Earth radius used by the great-circle kernel
+EARTH_RADIUS_KM = 6371.0088
+
+# Great-circle (haversine) distances in km between points given as arrays of degrees,
+# broadcasting one point against many in a single NumPy pass. Missing coordinates give NaN.
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+# Haversine differs from the ellipsoidal geodesic by at most about 0.56%
+HAVERSINE_RELATIVE_ERROR = 0.0075
+
+# Distances from a location to many points and which of them lie within radius_km.
+# With refine, points whose haversine distance is too close to the radius to call are
+# re-measured with the exact geodesic.
+def distances_within(location, lats, lons, radius_km, refine=False):
+    distances = haversine_km(location[0], location[1], lats, lons)
+    if refine:
+        borderline = np.flatnonzero(np.abs(distances - radius_km) <= radius_km * HAVERSINE_RELATIVE_ERROR)
+        for i in borderline:
+            distances[i] = calculate_distance(location, (lats[i], lons[i]))
+    return distances, distances <= radius_km
+
+# Latitude/longitude box containing every point within radius_km of a location, on the
+# same sphere as haversine_km. The radius is padded by HAVERSINE_RELATIVE_ERROR so the
+# box also holds points that the geodesic refinement may count as inside.
+def bounding_box(lat, lon, radius_km):
+    distance = min(radius_km * (1 + HAVERSINE_RELATIVE_ERROR) / EARTH_RADIUS_KM, math.pi)
+    lat_delta = math.degrees(distance)
+    # Widest longitude of the circle, which lies off the location's parallel; a circle
+    # reaching a pole spans every longitude
+    sin_ratio = math.sin(distance) / math.cos(math.radians(lat)) if abs(lat) < 90 else 2
+    lon_delta = math.degrees(math.asin(sin_ratio)) if sin_ratio < 1 and lat_delta < 90 - abs(lat) else 360
+    return lat - lat_delta, lat + lat_delta, lon - lon_delta, lon + lon_delta
+
+# Retrieve active listings inside the bounding box of a radius around a location, the
+# candidates for an exact distance check
+def get_active_listings_near(lat, lon, radius_km):
+    if lat is None or lon is None:
+        return []
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    query = listing_rows(Listing.location_lat, Listing.location_lon) \
+        .filter(Listing.status == 'active', Listing.location_lat.between(min_lat, max_lat))
+    # Boxes crossing the antimeridian are only filtered by latitude
+    if min_lon >= -180 and max_lon <= 180:
+        query = query.filter(Listing.location_lon.between(min_lon, max_lon))
+    return query.order_by(Listing.distribution_date).all()
+
+# Unit-sphere coordinates of points given in degrees
+def unit_vectors(lats, lons):
+    lats, lons = np.radians(np.asarray(lats, dtype=np.float64)), np.radians(np.asarray(lons, dtype=np.float64))
+    return np.stack([np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)], axis=-1)
+
+# In-memory spatial index of points on the unit sphere, queried by radius or k-nearest.
+# A KD-tree (scipy's cKDTree when installed, otherwise a NumPy scan) covers the points
+# as of the last rebuild; points added since are scanned directly and removed ones are
+# masked out, until enough changes pile up to rebuild.
+class SpatialIndex:
+    def __init__(self, rebuild_threshold=256):
+        self.rebuild_threshold = rebuild_threshold
+        self.lock = threading.Lock()
+        self.points = {}
+        self.loaded_at = None
+        self._reset_snapshot()
+
+    def _reset_snapshot(self):
+        self.tree = None
+        self.tree_ids = np.empty(0, dtype=np.int64)
+        self.tree_vectors = np.empty((0, 3))
+        self.tree_id_set = set()
+        self.pending = {}
+        self.removed = set()
+
+    # Replace the whole index with the given (id, lat, lon) rows
+    def load(self, rows):
+        with self.lock:
+            self.points = {point_id: unit_vectors(lat, lon) for point_id, lat, lon in rows
+                           if lat is not None and lon is not None}
+            self._rebuild()
+            self.loaded_at = time.monotonic()
+
+    def _rebuild(self):
+        self._reset_snapshot()
+        if not self.points:
+            return
+        self.tree_ids = np.fromiter(self.points.keys(), dtype=np.int64, count=len(self.points))
+        self.tree_vectors = np.stack(list(self.points.values()))
+        self.tree_id_set = set(self.points)
+        self.tree = cKDTree(self.tree_vectors) if cKDTree else None
+
+    def _maybe_rebuild(self):
+        if len(self.pending) + len(self.removed) >= self.rebuild_threshold:
+            self._rebuild()
+
+    def add(self, point_id, lat, lon):
+        if lat is None or lon is None:
+            return self.remove(point_id)
+        with self.lock:
+            vector = unit_vectors(lat, lon)
+            self.points[point_id] = vector
+            self.pending[point_id] = vector
+            if point_id in self.tree_id_set:
+                self.removed.add(point_id)
+            self._maybe_rebuild()
+
+    def remove(self, point_id):
+        with self.lock:
+            self.points.pop(point_id, None)
+            self.pending.pop(point_id, None)
+            if point_id in self.tree_id_set:
+                self.removed.add(point_id)
+            self._maybe_rebuild()
+
+    # Chord lengths of every indexed point to a query vector, within max_chord
+    def _candidates(self, vector, max_chord):
+        if self.tree is not None:
+            positions = self.tree.query_ball_point(vector, max_chord)
+        else:
+            positions = np.flatnonzero(np.linalg.norm(self.tree_vectors - vector, axis=1) <= max_chord)
+        candidates = {int(self.tree_ids[i]): float(np.linalg.norm(self.tree_vectors[i] - vector)) for i in positions
+                      if int(self.tree_ids[i]) not in self.removed}
+        for point_id, pending_vector in self.pending.items():
+            chord = float(np.linalg.norm(pending_vector - vector))
+            if chord <= max_chord:
+                candidates[point_id] = chord
+        return candidates
+
+    # IDs and great-circle distances in km of points within radius_km, nearest first,
+    # at most k of them when k is given
+    def query(self, lat, lon, radius_km, k=None):
+        # The chord of a negative radius would wrap around the sphere
+        if not radius_km > 0 or (k is not None and k < 1):
+            return []
+        vector = unit_vectors(lat, lon)
+        max_chord = 2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)
+        with self.lock:
+            candidates = self._candidates(vector, max_chord)
+        nearest = sorted((2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0)), point_id)
+                         for point_id, chord in candidates.items())
+        return [(point_id, distance) for distance, point_id in nearest[:k]]
+
+    # Whether the index was never loaded or was loaded more than max_age seconds ago
+    def stale(self, max_age):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > max_age
+
+# Spatial index over active listings, rebuilt from the database on first use and every
+# LISTING_INDEX_REFRESH seconds so listings created by other processes show up
+listing_index = SpatialIndex()
+
+def refresh_listing_index(force=False):
+    if force or listing_index.stale(app.config['LISTING_INDEX_REFRESH']):
+        listing_index.load(db.session.query(Listing.id, Listing.location_lat, Listing.location_lon)
+                           .filter(Listing.status == 'active').all())
+    return listing_index
+
+# Spatial index over public users' home locations, kept up to date the same way
+public_user_index = SpatialIndex()
+
+def refresh_public_user_index(force=False):
+    if force or public_user_index.stale(app.config['PUBLIC_USER_INDEX_REFRESH']):
+        public_user_index.load(db.session.query(PublicUser.id, PublicUser.location_lat, PublicUser.location_lon).all())
+    return public_user_index
+
+# Verified public users living within radius_km of a location, counted and listed in
+# total and by the priority factors used in allocation
+def estimate_demand(lat, lon, radius_km):
+    nearby_ids = [user_id for user_id, _ in refresh_public_user_index().query(lat, lon, radius_km)]
+    users = db.session.query(PublicUser.id, PublicUser.income_range, PublicUser.senior_citizen, PublicUser.oku_card_holder) \
+        .filter(PublicUser.id.in_(nearby_ids), PublicUser.is_verified == True).order_by(PublicUser.id).all()
+
+    def bucket(members):
+        return {'count': len(members), 'user_ids': members}
+
+    by_income_range = {}
+    for user in users:
+        by_income_range.setdefault(user.income_range, []).append(user.id)
+
+    return {
+        'radius_km': radius_km,
+        'total': bucket([user.id for user in users]),
+        'income_range': {income_range: bucket(members) for income_range, members in by_income_range.items()},
+        'senior_citizen': bucket([user.id for user in users if user.senior_citizen]),
+        'oku_card_holder': bucket([user.id for user in users if user.oku_card_holder]),
+    }
+
+# Counts of an estimate_demand result without the user IDs
+def demand_counts(demand):
+    return {
+        'radius_km': demand['radius_km'],
+        'total': demand['total']['count'],
+        'income_range': {income_range: group['count'] for income_range, group in demand['income_range'].items()},
+        'senior_citizen': demand['senior_citizen']['count'],
+        'oku_card_holder': demand['oku_card_holder']['count'],
+    }
+
+# Active listings within radius_km of a location paired with their distances, by
+# distribution date, limited to the k nearest when k is given
+def find_nearby_active_listings(lat, lon, radius_km, k=None):
+    if lat is None or lon is None:
+        return []
+
+    if app.config['LISTING_INDEX_ENABLED']:
+        index = refresh_listing_index()
+        # Listings closed since the index was loaded are dropped by the status filter, so
+        # more than k are fetched, and more again until k are active or none are left
+        fetch = None if k is None else k * app.config['NEARBY_INDEX_OVERFETCH']
+        while True:
+            candidates = index.query(lat, lon, radius_km, fetch)
+            distances = dict(candidates)
+            listings = listing_rows().filter(Listing.id.in_(list(distances)), Listing.status == 'active') \
+                .order_by(Listing.distribution_date).all()
+            if fetch is None or len(listings) >= k or len(candidates) < fetch:
+                break
+            fetch *= 2
+        nearby = [(listing, distances[listing.id]) for listing in listings]
+    else:
+        listings = get_active_listings_near(lat, lon, radius_km)
+        distances, within = distances_within((lat, lon),
+                                             [listing.location_lat for listing in listings],
+                                             [listing.location_lon for listing in listings],
+                                             radius_km, refine=app.config['NEARBY_GEODESIC_REFINEMENT'])
+        nearby = [(listing, float(distance)) for listing, distance, inside in zip(listings, distances, within) if inside]
+
+    if k is not None:
+        nearest = {listing.id for listing, _ in sorted(nearby, key=lambda pair: pair[1])[:k]}
+        nearby = [pair for pair in nearby if pair[0].id in nearest]
+    return nearby
+
+# Radius in km requested through ?radius=, capped at MAX_RADIUS_KM, or None when it is
+# not a positive number
+def radius_arg(default_km):
+    radius_km = request.args.get('radius', default_km, type=float)
+    if not radius_km > 0:
+        return None
+    return min(radius_km, app.config['MAX_RADIUS_KM'])
+
+# Retrieve the listings a user requested, optionally filtered by request status, with
+# their organization names in a single joined query
+def get_requested_listing_rows(user_id, status=None):
+    query = listing_rows().join(Request, Request.listing_id == Listing.id).filter(Request.user_id == user_id)
+    if status:
+        query = query.filter(Request.status == status)
+    return query.order_by(Request.id).all()
+
 # Retrieve specific listing by id
 def get_listing_by_id(id):
     listing = Listing.query.get(id)
     return listing
 
+# Retrieve the response row of a specific listing by id
+def get_listing_row_by_id(id):
+    return listing_rows().filter(Listing.id == id).first()
+
 ### Resources Routes
 @app.route('/listings', methods=['POST'])
 def create_listing():
@@ -591,89 +1393,107 @@ def create_listing():
         picture_url=picture_url
     )
     db.session.add(listing)
+    invalidate_responses('listings')
     db.session.commit()
+    listing_index.add(listing.id, float(location_lat), float(location_lon))
 
-    # Schedule genetic algorithm for the new listing
-    execution_time = distribution_date - timedelta(hours=24)
-    scheduler.add_job(genetic_algorithm_and_store, 'date', run_date=execution_time, args=[listing.id])
-    logging.info(f"Scheduled job for new listing {listing.id} at {execution_time}")
+    # Schedule genetic algorithm for the new listing, batch mode picks it up on its own
+    if app.config['ALLOCATION_MODE'] == 'listing':
+        schedule_listing_allocation(listing.id, distribution_date)
+
+    # Expected demand around the new listing
+    demand = estimate_demand(float(location_lat), float(location_lon), app.config['DEMAND_RADIUS_KM'])
 
-    return jsonify({'message': 'Listing created successfully'}), 201
+    return jsonify({'message': 'Listing created successfully', 'listing_id': listing.id,
+                    'expected_demand': demand_counts(demand)}), 201
 
 
 @app.route('/listings', methods=['GET'])
+@cached_response('listings')
 def get_listings():
     status = request.args.get('status')
-    if status:
-        listings = get_listings_by_status(status)
-    else:
-        listings = get_all_listings()
+    limit, cursor = page_args()
+    try:
+        if status:
+            listings, next_cursor = get_listings_by_status(status, limit, cursor)
+        else:
+            listings, next_cursor = get_all_listings(limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
 
 
         
-    response = []
-    for listing in listings:
-        org_name = listing.organization.name
-        location_name = listing.location_name
-        quantity = listing.quantity
-        status = listing.status
-        date_time = listing.distribution_date
-        resource_type = listing.resource_type
-        picture_url = None
-        if listing.picture_url:
-            picture_url = request.host_url + 'uploads/' + listing.picture_url
+    def response():
+        for listing in listings:
+            org_name = listing.organization_name
+            location_name = listing.location_name
+            quantity = listing.quantity
+            status = listing.status
+            date_time = listing.distribution_date
+            resource_type = listing.resource_type
+            picture_url = None
+            if listing.picture_url:
+                picture_url = request.host_url + 'uploads/' + listing.picture_url
 
-        response.append({
-            'id': listing.id,
-            'organization_name': org_name,
-            'quantity': quantity,
-            'date_time': date_time,
-            'location_name': location_name,
-            'resource_type': resource_type,
-            'status': status,
-            'picture_url': picture_url
+            yield {
+                'id': listing.id,
+                'organization_name': org_name,
+                'quantity': quantity,
+                'date_time': date_time,
+                'location_name': location_name,
+                'resource_type': resource_type,
+                'status': status,
+                'picture_url': picture_url
 
-        })
-    return jsonify(response)
+            }
+    return paged_response(response(), next_cursor)
 
 #Listings created by organization
 @app.route('/listings/org/<organization_id>')
 def get_org_listings(organization_id):
     status = request.args.get('status')
+    limit, cursor = page_args()
 
-    if status:
-        listings = get_listings_by_organization_and_status(organization_id, status)
-    else:
-        listings = get_listings_by_organization(organization_id)
-
-    if not listings:
+    try:
+        if status:
+            listings, next_cursor = get_listings_by_organization_and_status(organization_id, status, limit, cursor)
+        else:
+            listings, next_cursor = get_listings_by_organization(organization_id, limit, cursor)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+
+    # Past the last page is an empty page, not a missing organization
+    first, listings = peek(listings)
+    if cursor and first is None:
+        return jsonify([])
+    if first is None:
         return jsonify({'message': 'No listings found for the organization'}), 404
     
-    response = []
-    for listing in listings:
-        org_id = listing.organization.id
-        org_name = listing.organization.name
-        location_name = listing.location_name
-        quantity = listing.quantity
-        date_time = listing.distribution_date
-        resource_type = listing.resource_type
-        picture_url = None
-        if listing.picture_url:
-            picture_url = request.host_url + 'uploads/' + listing.picture_url
+    def response():
+        for listing in listings:
+            org_id = listing.organization_id
+            org_name = listing.organization_name
+            location_name = listing.location_name
+            quantity = listing.quantity
+            date_time = listing.distribution_date
+            resource_type = listing.resource_type
+            picture_url = None
+            if listing.picture_url:
+                picture_url = request.host_url + 'uploads/' + listing.picture_url
 
 
-        response.append({
-            'id': listing.id,
-            'organization_id': org_id,
-            'organization_name': org_name,
-            'quantity': quantity,
-            'date_time': date_time,
-            'location_name': location_name,
-            'resource_type': resource_type,
-            'picture_url': picture_url
-           
-        })
-    return jsonify(response)
+            yield {
+                'id': listing.id,
+                'organization_id': org_id,
+                'organization_name': org_name,
+                'quantity': quantity,
+                'date_time': date_time,
+                'location_name': location_name,
+                'resource_type': resource_type,
+                'picture_url': picture_url
+               
+            }
+    return paged_response(response(), next_cursor)
 
 
 #Nearby listings for public user
@@ -685,45 +1505,67 @@ def get_nearby_listings(user_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    user_location = (user.location_lat, user.location_lon)
-
-    listings = get_active_listings()
+    # Optional radius, k-nearest limit and sort=distance (default is by distribution date)
+    radius_km = radius_arg(app.config['NEARBY_RADIUS_KM'])
+    if radius_km is None:
+        return jsonify({'error': 'Radius must be a positive number of km'}), 400
+    k = request.args.get('k', type=int)
+    if k is not None and k < 1:
+        return jsonify({'error': 'k must be a positive number of listings'}), 400
+
+    nearby = find_nearby_active_listings(user.location_lat, user.location_lon, radius_km, k)
+    if request.args.get('sort') == 'distance':
+        nearby.sort(key=lambda pair: pair[1])
 
     nearby_listings = []
-    for listing in listings:
-        listing_location = (listing.location_lat, listing.location_lon)
-        distance_km = calculate_distance(user_location, listing_location)
-        if distance_km <= 5:  # Filter only listings within 5km
-
-            # Calculate the countdown in milliseconds to 24 hours before distribution_date
-            distribution_date = listing.distribution_date
-            countdown_target = distribution_date - timedelta(hours=24)
-            current_time = datetime.datetime.now()
-            countdown_ms = max(int((countdown_target - current_time).total_seconds() * 1000), 0)
-            resource_type = listing.resource_type
-            picture_url = None
-            if listing.picture_url:
-                picture_url = request.host_url + 'uploads/' + listing.picture_url
+    for listing, distance_km in nearby:
 
-            nearby_listings.append({
-                'id': listing.id,
-                'organization_name': listing.organization.name,
-                'quantity': listing.quantity,
-                'date_time': distribution_date,
-                'location_name': listing.location_name,
-                'countdown': countdown_ms,
-                'resource_type': resource_type,
-                'picture_url': picture_url
-                
-            })
+        # Calculate the countdown in milliseconds to 24 hours before distribution_date
+        distribution_date = listing.distribution_date
+        countdown_target = distribution_date - timedelta(hours=24)
+        current_time = datetime.datetime.now()
+        countdown_ms = max(int((countdown_target - current_time).total_seconds() * 1000), 0)
+        resource_type = listing.resource_type
+        picture_url = None
+        if listing.picture_url:
+            picture_url = request.host_url + 'uploads/' + listing.picture_url
+
+        nearby_listings.append({
+            'id': listing.id,
+            'organization_name': listing.organization_name,
+            'quantity': listing.quantity,
+            'date_time': distribution_date,
+            'location_name': listing.location_name,
+            'countdown': countdown_ms,
+            'resource_type': resource_type,
+            'picture_url': picture_url,
+            'distance_km': round(distance_km, 3)
+            
+        })
     
     return jsonify(nearby_listings)
 
 
+# Eligible public users around a listing, bucketed by priority factors
+@app.route('/listings/<id>/demand', methods=['GET'])
+def get_listing_demand(id):
+    listing = get_listing_by_id(id)
+    if not listing:
+        return jsonify({'error': 'Listing not found'}), 404
+    if listing.location_lat is None or listing.location_lon is None:
+        return jsonify({'error': 'Listing has no location'}), 400
+
+    radius_km = radius_arg(app.config['DEMAND_RADIUS_KM'])
+    if radius_km is None:
+        return jsonify({'error': 'Radius must be a positive number of km'}), 400
+    return jsonify(estimate_demand(listing.location_lat, listing.location_lon, radius_km))
+
+
 # View specific listings
 @app.route('/listings/<id>', methods=['GET'])
+@cached_response('listing:{id}')
 def open_listing(id):
-    listing = get_listing_by_id(id)
+    listing = get_listing_row_by_id(id)
     if not listing:
         return jsonify({'error': 'Listing not found'}), 404
     
@@ -732,8 +1574,8 @@ def open_listing(id):
         picture_url = request.host_url + 'uploads/' + listing.picture_url
 
     response = {
-        'organization_name': listing.organization.name,
-        'organization_id': listing.organization.id,
+        'organization_name': listing.organization_name,
+        'organization_id': listing.organization_id,
         'quantity': listing.quantity,
         'date_time': listing.distribution_date,
         'location_name': listing.location_name,
@@ -802,40 +1644,28 @@ def request_listing(id):
 def get_requested_listings(user_id):
     status = request.args.get('status')
 
-    print(f"Fetching listings for user {user_id} with status filter: {status}")
+    logging.debug(f"Fetching listings for user {user_id} with status filter: {status}")
 
     user = User.query.get(user_id)
     if not user:
         return jsonify({'message': 'User not found'}), 404
     
-    # Retrieve requests made by the user, optionally filtered by status
-    if status:
-        user_requests = Request.query.filter_by(user_id=user_id, status=status).all()
-    else:
-        user_requests = Request.query.filter_by(user_id=user_id).all()
-
+    # Retrieve listings requested by the user, optionally filtered by request status
     listings = []
-    for req in user_requests:
-        listing = Listing.query.get(req.listing_id)
-        if listing:
-            org_name = listing.organization.name
-            location_name = listing.location_name
-            quantity = listing.quantity
-            status = listing.status
-            date_time = listing.distribution_date
-            picture_url = None
-            if listing.picture_url:
-                picture_url = request.host_url + 'uploads/' + listing.picture_url
+    for listing in get_requested_listing_rows(user_id, status):
+        picture_url = None
+        if listing.picture_url:
+            picture_url = request.host_url + 'uploads/' + listing.picture_url
 
-            listings.append({
-                'id': listing.id,
-                'organization_name': org_name,
-                'quantity': quantity,
-                'date_time': date_time,
-                'location_name': location_name,
-                'status': status,
-                'picture_url': picture_url
-            })
+        listings.append({
+            'id': listing.id,
+            'organization_name': listing.organization_name,
+            'quantity': listing.quantity,
+            'date_time': listing.distribution_date,
+            'location_name': listing.location_name,
+            'status': listing.status,
+            'picture_url': picture_url
+        })
 
     return jsonify({'listings': listings}), 200
 
@@ -856,51 +1686,37 @@ def get_request_status(listing_id, user_id):
 
 ###Genetic Algorithm 
 
-scheduler = BackgroundScheduler()
+# Jobs are kept in the database so they survive restarts
+scheduler = BackgroundScheduler(
+    jobstores={'default': SQLAlchemyJobStore(url=app.config['SCHEDULER_JOBSTORE_URL'])},
+    executors={'default': SchedulerThreadPoolExecutor(app.config['ALLOCATION_THREADS'])}
+)
 
 # Define a custom class for individuals with a fitness attribute
 creator.create("FitnessMax", base.Fitness, weights=(1.0,))
 creator.create("Individual", list, fitness=creator.FitnessMax)
 
-# Toolbox setup
-toolbox = base.Toolbox()
-
-def get_requests_for_listing(listing_id):
-    requests = Request.query.filter_by(listing_id=listing_id, status='pending').all()
-    return requests
-
-def get_user_data(user_id):
-    return User.query.get(user_id)
-
 def get_listing_quantity(listing_id):
     listing = Listing.query.get(listing_id)
     return listing.quantity if listing else 0
 
-# Fitness Function
-def calculate_fitness(user):
-    print("calculate_fitness called for user:", user.id)
-    fitness = 0
-
-    if user.income_range == 'Below 2500':
-        fitness += 10
-    elif user.income_range == 'RM2500 - RM3500':
-        fitness += 9
-    elif user.income_range == 'RM3500 - RM4500':
-        fitness += 8
-    elif user.income_range == 'RM4500 - RM5500':
-        fitness += 7
-    elif user.income_range == 'RM5500 - RM6500':
-        fitness += 6
-    elif user.income_range == 'RM6500 - RM7500':
-        fitness += 5
-    elif user.income_range == 'RM7500 - RM8500':
-        fitness += 4
-    elif user.income_range == 'RM8500 - RM9500':
-        fitness += 3
-    elif user.income_range == 'RM9500 - RM10500':
-        fitness += 2
-    elif user.income_range == 'Above RM10500':
-        fitness += 1
+# Priority points for each income range, poorest households first
+INCOME_RANGE_SCORES = {
+    'Below 2500': 10,
+    'RM2500 - RM3500': 9,
+    'RM3500 - RM4500': 8,
+    'RM4500 - RM5500': 7,
+    'RM5500 - RM6500': 6,
+    'RM6500 - RM7500': 5,
+    'RM7500 - RM8500': 4,
+    'RM8500 - RM9500': 3,
+    'RM9500 - RM10500': 2,
+    'Above RM10500': 1,
+}
+
+# Priority score of a requester given the date of their last accepted request
+def calculate_priority(user, last_accepted_date, now=None):
+    fitness = INCOME_RANGE_SCORES.get(user.income_range, 0)
 
     fitness += user.num_dependents
 
@@ -910,121 +1726,566 @@ def calculate_fitness(user):
     if user.oku_card_holder:
         fitness += 2
 
-    # Calculate the time since the last accepted request
-    last_accepted_request = Request.query.filter_by(user_id=user.id, status='Accepted').order_by(Request.request_date.desc()).first()
-    
-    if last_accepted_request:
-        time_since_last_accepted = datetime.datetime.now() - last_accepted_request.request_date
+    if last_accepted_date:
+        if now is None:
+            now = datetime.datetime.now()
+        time_since_last_accepted = now - last_accepted_date
         # Reduce the fitness score by 2 point if the last accepted request was within the last 30 days
         if time_since_last_accepted <= timedelta(days=30):
             fitness -= 2
 
     return fitness
 
-# Genetic Algorithm Implementation
-import random
-from deap import base, creator, tools, algorithms
+# Score table of a listing's requesters, indexed by requester position
+ScoreTable = namedtuple('ScoreTable', ['user_ids', 'scores', 'request_dates'])
 
-def genetic_algorithm(listing_id, population_size=100, max_generations=250):
-    quantity = get_listing_quantity(listing_id)
-    if quantity == 0:
-        return []
-
-    requests = get_requests_for_listing(listing_id)
-    if not requests:
-        return []
-    
-    population = [request.user_id for request in requests]
+# Last accepted request date of every user who requested one of the listings, grouped in a single query
+def load_last_accepted_dates(listing_ids):
+    listing_requesters = db.session.query(Request.user_id).filter(Request.listing_id.in_(listing_ids))
+    return dict(
+        db.session.query(Request.user_id, db.func.max(Request.request_date))
+        .filter(Request.status == 'Accepted', Request.user_id.in_(listing_requesters))
+        .group_by(Request.user_id).all()
+    )
 
-    if len(population) <= quantity:
-        return population
+# Load every pending requester of a listing and score them with two queries
+def load_requester_scores(listing_id, timings=None):
+    started = time.perf_counter()
+    requesters = db.session.query(
+        Request.user_id,
+        Request.request_date,
+        PublicUser.income_range,
+        PublicUser.num_dependents,
+        PublicUser.senior_citizen,
+        PublicUser.oku_card_holder
+    ).join(PublicUser, PublicUser.id == Request.user_id) \
+        .filter(Request.listing_id == listing_id, Request.status == 'Pending') \
+        .order_by(Request.request_date, Request.id).all()
+
+    last_accepted = load_last_accepted_dates([listing_id])
+    loaded = time.perf_counter()
+
+    now = datetime.datetime.now()
+    table = ScoreTable(
+        user_ids=[row.user_id for row in requesters],
+        scores=[calculate_priority(row, last_accepted.get(row.user_id), now) for row in requesters],
+        request_dates=[row.request_date for row in requesters]
+    )
+    if timings is not None:
+        timings['load'] = loaded - started
+        timings['score'] = time.perf_counter() - loaded
+    return table
+
+# Outcome of an allocation engine: chosen requester positions, their total score,
+# the number of generations evolved and the best score so far, initial population first.
+# GA engines can also hand back their final population as lists of positions.
+AllocationResult = namedtuple('AllocationResult', ['indices', 'fitness', 'generations', 'history', 'population'],
+                              defaults=(None,))
+
+# Exact allocation: the objective is a sum of per-requester scores, so the best
+# allocation is the top-quantity requesters. Ties go to the earlier request since
+# the score table is ordered by request date.
+def topk_allocation(table, quantity, **options):
+    scores = table.scores
+    indices = heapq.nsmallest(quantity, range(len(scores)), key=lambda index: (-scores[index], index))
+    return AllocationResult(indices, sum(scores[index] for index in indices), 0, [])
+
+# Termination policy: stop once the best fitness has not improved for
+# stall_generations generations or the time budget has run out
+def should_stop(history, stall_generations, deadline):
+    if deadline is not None and time.monotonic() >= deadline:
+        return True
+    if stall_generations and len(history) > stall_generations:
+        return history[-1] <= history[-1 - stall_generations]
+    return False
+
+# Number of swaps that perturb a greedy seed individual
+def seed_swaps(quantity, rng):
+    return rng.randint(1, max(1, quantity // 10))
+
+# Tournament selection drawing from the run's own random generator
+def tournament_select(individuals, k, tournsize, rng):
+    return [max((rng.choice(individuals) for _ in range(tournsize)), key=attrgetter("fitness"))
+            for _ in range(k)]
+
+# DEAP's varAnd drawing from the run's own random generator
+def vary(population, toolbox, cxpb, mutpb, rng):
+    offspring = [toolbox.clone(individual) for individual in population]
+
+    for i in range(1, len(offspring), 2):
+        if rng.random() < cxpb:
+            offspring[i - 1], offspring[i] = toolbox.mate(offspring[i - 1], offspring[i])
+            del offspring[i - 1].fitness.values, offspring[i].fitness.values
+
+    for i in range(len(offspring)):
+        if rng.random() < mutpb:
+            offspring[i], = toolbox.mutate(offspring[i])
+            del offspring[i].fitness.values
+
+    return offspring
 
-    user_data = {user_id: get_user_data(user_id) for user_id in population}
+# Genetic Algorithm Implementation
+def ga_allocation(table, quantity, population_size=100, max_generations=250,
+                  stall_generations=None, time_budget=None, seed_ratio=0, seed=None,
+                  initial_population=None, return_population=False, num_seeded=None, **options):
+    # Every run has its own toolbox and random generator so runs can go concurrently
+    toolbox = base.Toolbox()
+    rng = random.Random(seed)
+
+    # Individuals hold requester positions into the score table, together with
+    # the set of chosen positions and their running score
+    population = range(len(table.user_ids))
+    scores = table.scores
+
+    def scored_individual(indices):
+        individual = creator.Individual(indices)
+        individual.chosen = set(indices)
+        individual.score = sum(scores[index] for index in indices)
+        return individual
+    
+    def clone_individual(individual):
+        clone = creator.Individual(individual)
+        clone.chosen = set(individual.chosen)
+        clone.score = individual.score
+        clone.fitness.values = individual.fitness.values
+        return clone
     
     def eval_individual(individual):
-        return (sum(calculate_fitness(user_data[user_id]) for user_id in individual),)
+        return (individual.score,)
 
     def unique_individual():
-        return creator.Individual(random.sample(population, quantity))
+        return scored_individual(rng.sample(population, quantity))
 
+    # Children keep the requesters both parents chose and split the rest of the union
     def custom_crossover(parent1, parent2):
-        crossover_point = random.randint(1, quantity - 1)
-        child1 = parent1[:crossover_point] + [x for x in parent2 if x not in parent1[:crossover_point]]
-        child2 = parent2[:crossover_point] + [x for x in parent1 if x not in parent2[:crossover_point]]
-        return creator.Individual(child1[:quantity]), creator.Individual(child2[:quantity])
+        shared = [x for x in parent1 if x in parent2.chosen]
+        rest = [x for x in parent1 if x not in parent2.chosen] + [x for x in parent2 if x not in parent1.chosen]
+        rng.shuffle(rest)
+        free = quantity - len(shared)
+        return scored_individual(shared + rest[:free]), scored_individual(shared + rest[free:])
+
+    # Swap the chosen requester at position i for one not yet chosen, updating the score by the delta
+    def swap_in(individual, i):
+        incoming = rng.choice(population)
+        while incoming in individual.chosen:
+            incoming = rng.choice(population)
+        outgoing = individual[i]
+        individual.chosen.remove(outgoing)
+        individual.chosen.add(incoming)
+        individual.score += scores[incoming] - scores[outgoing]
+        individual[i] = incoming
 
     def custom_mutate(individual, indpb=0.05):
         for i in range(len(individual)):
-            if random.random() < indpb:
-                swap_index = random.randint(0, len(individual) - 1)
-                individual[i], individual[swap_index] = individual[swap_index], individual[i]
+            if rng.random() < indpb:
+                swap_in(individual, i)
         return individual,
 
+    # Part of the population (num_seeded individuals, seed_ratio of it by default) starts
+    # at the greedy allocation or a few swaps away from it
+    def seeded_population(n):
+        greedy = topk_allocation(table, quantity).indices
+        seeded = int(n * seed_ratio) if num_seeded is None else min(num_seeded, n)
+        pop = [scored_individual(list(greedy)) for _ in range(seeded)]
+        for individual in pop[1:]:
+            for i in rng.sample(range(quantity), seed_swaps(quantity, rng)):
+                swap_in(individual, i)
+        return pop + [unique_individual() for _ in range(n - seeded)]
+
     toolbox.register("individual", unique_individual)
-    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("population", seeded_population)
     
+    toolbox.register("clone", clone_individual)
     toolbox.register("mate", custom_crossover)
     toolbox.register("mutate", custom_mutate, indpb=0.05)
-    toolbox.register("select", tools.selTournament, tournsize=3)
+    toolbox.register("select", tournament_select, tournsize=3, rng=rng)
     toolbox.register("evaluate", eval_individual)
 
-    pop = toolbox.population(n=population_size)
+    if initial_population:
+        pop = [scored_individual(list(indices)) for indices in initial_population]
+    else:
+        pop = toolbox.population(n=population_size)
+
+    # eaSimple loop with the termination policy checked after every generation
+    deadline = time.monotonic() + time_budget if time_budget else None
+    hall_of_fame = tools.HallOfFame(1)
+    stats = tools.Statistics(lambda individual: individual.fitness.values[0])
+    stats.register("max", max)
+
+    for individual, fitness in zip(pop, toolbox.map(toolbox.evaluate, pop)):
+        individual.fitness.values = fitness
+    hall_of_fame.update(pop)
+    history = [stats.compile(pop)["max"]]
+
+    generations = 0
+    while generations < max_generations and not should_stop(history, stall_generations, deadline):
+        offspring = vary(toolbox.select(pop, len(pop)), toolbox, cxpb=0.5, mutpb=0.2, rng=rng)
+        invalid = [individual for individual in offspring if not individual.fitness.valid]
+        for individual, fitness in zip(invalid, toolbox.map(toolbox.evaluate, invalid)):
+            individual.fitness.values = fitness
+        pop[:] = offspring
+        hall_of_fame.update(pop)
+        history.append(max(history[-1], stats.compile(pop)["max"]))
+        generations += 1
+
+    top_individual = hall_of_fame[0]
+    population = [list(individual) for individual in pop] if return_population else None
+    return AllocationResult(list(top_individual), top_individual.fitness.values[0], generations, history, population)
+
+# Evolve one island of the island-model GA, starting from its current population
+def evolve_island(table, quantity, population, generations, seed, options):
+    return ga_allocation(table, quantity, max_generations=generations, seed=seed,
+                         initial_population=population, return_population=True, **options)
+
+# Island-model Genetic Algorithm: sub-populations evolve independently through
+# island_map (a process pool's map when run from allocate_listing) and every
+# migration_interval generations each island sends its best individuals to the next
+def island_ga_allocation(table, quantity, population_size=100, max_generations=250, islands=4,
+                         migration_interval=10, migrants=2, seed=None, stall_generations=None,
+                         time_budget=None, island_map=map, **options):
+    rng = random.Random(seed)
+    deadline = time.monotonic() + time_budget if time_budget else None
+    island_size = max(2, population_size // islands)
+    migrants = min(migrants, island_size - 1)
+    # Tie-breaking follows positions, so the workers only need the scores
+    payload = table._replace(request_dates=())
+    # The islands share the seeds one population of population_size would get, rather
+    # than each flooring seed_ratio of its own smaller size
+    num_seeded = int(population_size * options.get('seed_ratio', 0))
+    options = dict(options, population_size=island_size, num_seeded=-(-num_seeded // islands))
+
+    populations = [None] * islands
+    best = None
+    history = []
+    generations = 0
+    while generations < max_generations and not should_stop(history, stall_generations, deadline):
+        epoch = min(migration_interval, max_generations - generations)
+        if deadline is not None:
+            options['time_budget'] = max(deadline - time.monotonic(), 0.001)
+        results = list(island_map(evolve_island, [payload] * islands, [quantity] * islands, populations,
+                                  [epoch] * islands, [rng.random() for _ in range(islands)], [options] * islands))
+
+        for result in results:
+            if best is None or result.fitness > best.fitness:
+                best = result
+        # Island histories start with their initial population, only the first epoch keeps it
+        trajectories = [result.history if generations == 0 else result.history[1:] for result in results]
+        for fitnesses in itertools.zip_longest(*trajectories, fillvalue=float('-inf')):
+            history.append(max(max(fitnesses), history[-1] if history else float('-inf')))
+        generations += max(result.generations for result in results)
+
+        # Ring migration: the best of each island replace the worst of the next one
+        ranked = [sorted(result.population, key=lambda indices: sum(table.scores[i] for i in indices), reverse=True)
+                  for result in results]
+        populations = [ranked[i][:-migrants] + ranked[i - 1][:migrants] if migrants else ranked[i]
+                       for i in range(islands)]
+
+    # Without a single epoch (no generations or no time left) the result is the best of
+    # an initial population, as with the other engines
+    if best is None:
+        return ga_allocation(payload, quantity, population_size=population_size, max_generations=0,
+                             seed=rng.random(), seed_ratio=options.get('seed_ratio', 0))
+
+    return AllocationResult(best.indices, best.fitness, generations, history)
+
+# Subset-preserving crossover over rows of requester positions. Requesters chosen
+# by both parents are always kept, the rest of each child is drawn from the union.
+def subset_crossover(parents1, parents2, rng):
+    quantity = parents1.shape[1]
+    union = np.sort(np.concatenate([parents1, parents2], axis=1), axis=1)
+    duplicate = np.zeros(union.shape, dtype=bool)
+    duplicate[:, 1:] = union[:, 1:] == union[:, :-1]
+    shared = np.zeros(union.shape, dtype=bool)
+    shared[:, :-1] = duplicate[:, 1:]
+
+    children = []
+    for _ in range(2):
+        keys = rng.random(union.shape)
+        keys[shared] = -1.0
+        keys[duplicate] = 2.0
+        order = np.argsort(keys, axis=1)[:, :quantity]
+        children.append(np.take_along_axis(union, order, axis=1))
+    return children
+
+# Array-backed Genetic Algorithm: the population is a 2-D array of requester
+# positions and selection, crossover and mutation run batched over all rows
+def numpy_ga_allocation(table, quantity, population_size=100, max_generations=250,
+                        cxpb=0.5, mutpb=0.2, tournsize=3, seed=None,
+                        stall_generations=None, time_budget=None, seed_ratio=0, **options):
+    rng = np.random.default_rng(seed)
+    scores = np.asarray(table.scores, dtype=np.float64)
+    num_requesters = len(scores)
+    rows = np.arange(population_size)
+
+    pop = np.stack([rng.choice(num_requesters, quantity, replace=False) for _ in rows])
+
+    # Greedy seeds and perturbations of them replace the first rows
+    num_seeded = int(population_size * seed_ratio)
+    if num_seeded:
+        greedy = np.array(topk_allocation(table, quantity).indices)
+        pop[:num_seeded] = greedy
+        unchosen = np.setdiff1d(np.arange(num_requesters), greedy)
+        for row in range(1, num_seeded):
+            swaps = min(int(rng.integers(1, max(1, quantity // 10) + 1)), len(unchosen))
+            pop[row, rng.choice(quantity, swaps, replace=False)] = rng.choice(unchosen, swaps, replace=False)
+
+    fitness = scores[pop].sum(axis=1)
+    best = pop[fitness.argmax()].copy()
+    best_fitness = fitness.max()
+    history = [float(best_fitness)]
+    deadline = time.monotonic() + time_budget if time_budget else None
+
+    generations = 0
+    while generations < max_generations and not should_stop(history, stall_generations, deadline):
+        # Tournament selection
+        contestants = rng.integers(population_size, size=(population_size, tournsize))
+        winners = contestants[rows, fitness[contestants].argmax(axis=1)]
+        pop = pop[winners]
+
+        # Crossover on consecutive pairs
+        pairs = np.flatnonzero(rng.random(population_size // 2) < cxpb) * 2
+        if len(pairs):
+            pop[pairs], pop[pairs + 1] = subset_crossover(pop[pairs], pop[pairs + 1], rng)
+
+        # Mutation swaps one chosen requester for one not yet chosen
+        mutants = np.flatnonzero(rng.random(population_size) < mutpb)
+        if len(mutants):
+            candidates = rng.integers(num_requesters, size=len(mutants))
+            fresh = ~(pop[mutants] == candidates[:, None]).any(axis=1)
+            mutants, candidates = mutants[fresh], candidates[fresh]
+            pop[mutants, rng.integers(quantity, size=len(mutants))] = candidates
+
+        fitness = scores[pop].sum(axis=1)
+        if fitness.max() > best_fitness:
+            best = pop[fitness.argmax()].copy()
+            best_fitness = fitness.max()
+        history.append(float(best_fitness))
+        generations += 1
+
+    return AllocationResult(best.tolist(), float(best_fitness), generations, history)
+
+# Allocation engines selectable through the ALLOCATION_ENGINE setting
+ALLOCATION_ENGINES = {
+    'topk': topk_allocation,
+    'ga': ga_allocation,
+    'ga_numpy': numpy_ga_allocation,
+    'ga_islands': island_ga_allocation,
+}
+
+# Choose requester positions for a listing's quantity with the given engine
+def allocate(table, quantity, engine='topk', **options):
+    if engine not in ALLOCATION_ENGINES:
+        raise ValueError(f"Unknown allocation engine '{engine}'")
+
+    if len(table.user_ids) <= quantity:
+        indices = list(range(len(table.user_ids)))
+        return AllocationResult(indices, sum(table.scores), 0, [])
+
+    return ALLOCATION_ENGINES[engine](table, quantity, **options)
+
+# Worker processes that run allocation engines outside the web process
+allocation_pool = None
+allocation_pool_lock = threading.Lock()
+
+def get_allocation_pool():
+    global allocation_pool
+    with allocation_pool_lock:
+        if allocation_pool is None:
+            # Spawned rather than forked, the web process is multi-threaded
+            allocation_pool = ProcessPoolExecutor(max_workers=app.config['ALLOCATION_PROCESSES'] or os.cpu_count(),
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        return allocation_pool
+
+# Allocate a listing and return the accepted user IDs
+def allocate_listing(listing_id, engine=None, **options):
+    quantity = get_listing_quantity(listing_id)
+    if quantity == 0:
+        return []
 
-    algorithms.eaSimple(pop, toolbox, cxpb=0.5, mutpb=0.2, ngen=max_generations, verbose=False)
+    timings = {}
+    table = load_requester_scores(listing_id, timings)
+    # End the read transaction so none stays open while the engine runs; storing the
+    # results starts a short one of its own
+    db.session.commit()
+    if not table.user_ids:
+        return []
 
-    top_individual = tools.selBest(pop, 1)[0]
-    return list(top_individual)
+    engine = engine or app.config['ALLOCATION_ENGINE']
+    started = time.perf_counter()
+    # topk is a single heap pass, cheaper than shipping the table to another process
+    if app.config['ALLOCATION_BACKEND'] != 'process' or engine == 'topk':
+        result = allocate(table, quantity, engine, **options)
+    elif engine == 'ga_islands':
+        # Islands are farmed out to the pool one migration interval at a time from this thread
+        result = allocate(table, quantity, engine, island_map=get_allocation_pool().map, **options)
+    else:
+        # Only plain data crosses the process boundary, the database stays in this process
+        result = get_allocation_pool().submit(allocate, table, quantity, engine, **options).result()
+    timings['solve'] = time.perf_counter() - started
+
+    record_allocation_phases(timings)
+    observe('allocation_requesters', (engine,), len(table.user_ids), REQUESTER_BUCKETS)
+    increment('allocations_total', (engine,))
+    increment('allocation_generations_total', (engine,), result.generations)
+    set_gauge('allocation_last_fitness', (engine,), result.fitness)
+    logging.info(f"Allocated listing {listing_id} with {engine}: {len(result.indices)} of {len(table.user_ids)} requesters, "
+                 f"fitness {result.fitness} after {result.generations} generations")
+    return [table.user_ids[index] for index in result.indices]
 
-def genetic_algorithm_and_store(listing_id, population_size=200, max_generations=500):
-    with app.app_context():
+def genetic_algorithm(listing_id, population_size=100, max_generations=250):
+    return allocate_listing(listing_id, 'ga', population_size=population_size, max_generations=max_generations)
+
+# Engine options taken from the app configuration
+def allocation_options():
+    return {
+        'stall_generations': app.config['GA_STALL_GENERATIONS'],
+        'time_budget': app.config['GA_TIME_BUDGET'],
+        'seed_ratio': app.config['GA_SEED_RATIO'],
+        'islands': app.config['GA_ISLANDS'],
+        'migration_interval': app.config['GA_MIGRATION_INTERVAL'],
+        'migrants': app.config['GA_MIGRANTS'],
+    }
 
-        # Update the listing status to 'closed'
-        listing = Listing.query.get(listing_id)
-        if listing:
-            listing.status = 'closed'
-            db.session.commit()
-  
-        # Run the genetic algorithm
-        accepted_user_ids = genetic_algorithm(listing_id, population_size, max_generations)
+# Persist an allocation in one short transaction: one query for the winners' profiles
+# and request IDs, one bulk insert into Accepted and set-based status updates
+def store_allocation(listing_id, accepted_user_ids, token, commit=True):
+    timings = {}
+    started = time.perf_counter()
+
+    # Complete the listing only while this worker's claim (token) still holds it. A worker
+    # whose lease ran out and was reclaimed by another stores nothing.
+    completed = Listing.query.filter(Listing.id == listing_id, Listing.status == 'closed',
+                                     Listing.allocation_owner == token) \
+        .update({Listing.status: 'completed', Listing.allocation_lease_expires: None}, synchronize_session=False)
+    if not completed:
+        if commit:
+            db.session.rollback()
+        logging.warning(f"Discarded allocation for listing {listing_id}: claim {token} no longer holds it")
+        return None
+
+    winners = db.session.query(
+        Request.id,
+        PublicUser.id.label('user_id'),
+        PublicUser.name,
+        PublicUser.location_name,
+        PublicUser.location_lon,
+        PublicUser.location_lat,
+        PublicUser.address,
+        PublicUser.telephone_number
+    ).join(PublicUser, PublicUser.id == Request.user_id) \
+        .filter(Request.listing_id == listing_id, Request.user_id.in_(accepted_user_ids)) \
+        .order_by(Request.id).all()
+
+    # One Accepted row per user, for their first request on the listing
+    accepted_rows = {}
+    for winner in winners:
+        accepted_rows.setdefault(winner.user_id, {
+            'request_id': winner.id,
+            'listing_id': listing_id,
+            'user_id': winner.user_id,
+            'user_name': winner.name,
+            'user_location': winner.location_name,
+            'user_lon': winner.location_lon,
+            'user_lat': winner.location_lat,
+            'user_address': winner.address,
+            'user_telephone': winner.telephone_number
+        })
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if accepted_rows:
+        db.session.execute(Accepted.__table__.insert(), list(accepted_rows.values()))
+    timings['insert'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    Request.query.filter(Request.listing_id == listing_id, Request.user_id.in_(accepted_user_ids)) \
+        .update({Request.status: 'Accepted'}, synchronize_session=False)
+    Request.query.filter(Request.listing_id == listing_id, Request.user_id.notin_(accepted_user_ids)) \
+        .update({Request.status: 'Rejected'}, synchronize_session=False)
+    invalidate_responses('listings', f'listing:{listing_id}', f'accepted:{listing_id}')
+    timings['update'] = time.perf_counter() - started
+
+    if commit:
+        started = time.perf_counter()
+        db.session.commit()
+        timings['commit'] = time.perf_counter() - started
 
+    logging.info(f"Stored allocation for listing {listing_id}: {len(accepted_rows)} accepted, "
+                 + ", ".join(f"{phase} {seconds * 1000:.1f}ms" for phase, seconds in timings.items()))
+    record_allocation_phases({'persist': sum(timings.values())})
+    return timings
 
-        requests = Request.query.filter_by(listing_id=listing_id).all()
+### Allocation claims, so every listing is allocated exactly once across workers
 
+# Identity of this process in allocation claims
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}'
 
-        # Store the accepted users in the Accepted table
-        for user_id in accepted_user_ids:
-            user = PublicUser.query.get(user_id)
-            request_id = Request.query.filter_by(listing_id=listing_id, user_id=user_id).first().id
-            accepted_entry = Accepted(
-                request_id=request_id, 
-                listing_id=listing_id, 
-                user_id=user.id,
-                user_name=user.name,
-                user_location=user.location_name,
-                user_lon=user.location_lon,
-                user_lat=user.location_lat,
-                user_address=user.address,
-                user_telephone=user.telephone_number
-            )
-            db.session.add(accepted_entry)
+# Listings that may be claimed: active ones, and closed ones whose claiming worker
+# let its lease run out without completing them
+def claimable_listings(now):
+    return db.or_(
+        Listing.status == 'active',
+        db.and_(Listing.status == 'closed', Listing.allocation_lease_expires < now)
+    )
 
+# Claim the given listings for this worker and return the IDs actually claimed with the
+# claim's token, which storing the results requires. The claim is a conditional UPDATE,
+# atomic on every backend, so concurrent workers never both win a listing; it also
+# closes the listings.
+def claim_listings(listing_ids):
+    if not listing_ids:
+        return [], None
+
+    now = datetime.datetime.now()
+    token = f'{WORKER_ID}:{uuid.uuid4().hex[:8]}'
+    Listing.query.filter(Listing.id.in_(listing_ids), claimable_listings(now)).update({
+        Listing.status: 'closed',
+        Listing.allocation_owner: token,
+        Listing.allocation_lease_expires: now + timedelta(seconds=app.config['ALLOCATION_LEASE_SECONDS'])
+    }, synchronize_session=False)
+    # Claimed listings show as closed
+    invalidate_responses('listings', *(f'listing:{listing_id}' for listing_id in listing_ids))
+    db.session.commit()
 
-        for request in requests:
-            if request.user_id in accepted_user_ids:
-                # Update request status to accepted
-                request.status = 'Accepted'
-            else:
-                # Update request status to rejected
-                request.status = 'Rejected'
+    claimed = [listing_id for listing_id, in
+               db.session.query(Listing.id).filter(Listing.id.in_(listing_ids), Listing.allocation_owner == token).all()]
+    # Closed listings are no longer nearby candidates
+    for listing_id in claimed:
+        listing_index.remove(listing_id)
+    return claimed, token
+
+# Claim up to limit due listings, oldest cutoff first, like claim_listings. Rows locked by other workers are
+# skipped with SELECT ... FOR UPDATE SKIP LOCKED where the database supports it (SQLite
+# ignores it and relies on the conditional UPDATE alone).
+def claim_due_listings(limit):
+    now = datetime.datetime.now()
+    due = db.session.query(Listing.id) \
+        .filter(claimable_listings(now), Listing.distribution_date <= now + timedelta(hours=24)) \
+        .order_by(Listing.distribution_date, Listing.id) \
+        .limit(limit).with_for_update(skip_locked=True).all()
+    return claim_listings([listing_id for listing_id, in due])
 
+def genetic_algorithm_and_store(listing_id, population_size=200, max_generations=500):
+    with app.app_context():
+        # Claim the listing, which closes it. Listings already allocated or being
+        # allocated by another worker are left alone.
+        claimed, token = claim_listings([listing_id])
+        if not claimed:
+            return []
 
-        # Update the listing status to completed
-        listing = Listing.query.get(listing_id)
-        if listing:
-            listing.status = 'completed'
+    return allocate_claimed_listing(listing_id, token, population_size, max_generations)
 
+# Allocate a listing this worker has claimed with the given token and store the results
+def allocate_claimed_listing(listing_id, token, population_size=200, max_generations=500):
+    with app.app_context():
+        # Run the configured allocation engine
+        accepted_user_ids = allocate_listing(listing_id, population_size=population_size, max_generations=max_generations,
+                                             **allocation_options())
 
-        db.session.commit()
+        # Store the accepted users and update request and listing statuses, unless the
+        # claim was lost in the meantime
+        if store_allocation(listing_id, accepted_user_ids, token) is None:
+            return []
 
 
     return accepted_user_ids
@@ -1032,14 +2293,180 @@ def genetic_algorithm_and_store(listing_id, population_size=200, max_generations
 
 
 
+### Batch allocation across listings closing in the same window
+
+# Candidate (listing, requester) pairs of the listings, weighted by the requester's
+# priority minus a penalty for the distance between their home and the listing
+def load_batch_candidates(listings):
+    listing_ids = [listing.id for listing in listings]
+    locations = {listing.id: (listing.location_lat, listing.location_lon) for listing in listings}
+
+    requests = db.session.query(
+        Request.id,
+        Request.listing_id,
+        Request.user_id,
+        Request.request_date,
+        PublicUser.income_range,
+        PublicUser.num_dependents,
+        PublicUser.senior_citizen,
+        PublicUser.oku_card_holder,
+        PublicUser.location_lat,
+        PublicUser.location_lon
+    ).join(PublicUser, PublicUser.id == Request.user_id) \
+        .filter(Request.listing_id.in_(listing_ids), Request.status == 'Pending').all()
+    last_accepted = load_last_accepted_dates(listing_ids)
+
+    # Distance of every request's home to its listing in one vectorized pass
+    distances = haversine_km([row.location_lat for row in requests], [row.location_lon for row in requests],
+                             [locations[row.listing_id][0] for row in requests],
+                             [locations[row.listing_id][1] for row in requests])
+
+    now = datetime.datetime.now()
+    penalty = app.config['BATCH_DISTANCE_PENALTY']
+    candidates = []
+    for row, distance in zip(requests, distances):
+        weight = calculate_priority(row, last_accepted.get(row.user_id), now)
+        if not np.isnan(distance):
+            weight -= penalty * float(distance)
+        candidates.append((weight, row.request_date or now, row.id, row.listing_id, row.user_id))
+    return candidates
+
+# Greedy joint assignment: heaviest candidates first, as long as the listing has stock
+# left and the user has won fewer than user_cap listings in this batch
+def greedy_batch_assignment(candidates, capacities, user_cap):
+    remaining = dict(capacities)
+    wins = Counter()
+    assignment = {listing_id: [] for listing_id in capacities}
+    assigned = set()  # (listing_id, user_id) pairs, for constant-time duplicate checks
+
+    for weight, request_date, request_id, listing_id, user_id in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+        if remaining[listing_id] > 0 and wins[user_id] < user_cap and (listing_id, user_id) not in assigned:
+            assignment[listing_id].append(user_id)
+            assigned.add((listing_id, user_id))
+            remaining[listing_id] -= 1
+            wins[user_id] += 1
+
+    return assignment
+
+# Allocate several listings jointly and commit the results for all of them at once
+def batch_allocate_and_store(listing_ids):
+    with app.app_context():
+        claimed, token = claim_listings(listing_ids)
+        if not claimed:
+            return {}
+        listings = Listing.query.filter(Listing.id.in_(claimed)).all()
+
+        started = time.perf_counter()
+        candidates = load_batch_candidates(listings)
+        assignment = greedy_batch_assignment(candidates, {listing.id: listing.quantity or 0 for listing in listings},
+                                             app.config['BATCH_USER_CAP'])
+        solve_time = time.perf_counter() - started
+        record_allocation_phases({'solve': solve_time})
+        increment('allocations_total', ('batch',), len(listings))
+
+        # Listings whose claim was lost meanwhile are left to their new owner
+        for listing_id, accepted_user_ids in list(assignment.items()):
+            if store_allocation(listing_id, accepted_user_ids, token, commit=False) is None:
+                del assignment[listing_id]
+        db.session.commit()
+
+        logging.info(f"Batch allocated {len(listings)} listings from {len(candidates)} requests "
+                     f"in {solve_time * 1000:.1f}ms")
+        return assignment
+
+# Scheduled every BATCH_ALLOCATION_WINDOW minutes: jointly allocate every active
+# listing whose 24-hour cutoff has passed since the previous run
+def batch_allocation_job():
+    with app.app_context():
+        now = datetime.datetime.now()
+        listing_ids = [listing_id for listing_id, in db.session.query(Listing.id)
+                       .filter(claimable_listings(now), Listing.distribution_date <= now + timedelta(hours=24)).all()]
+    if listing_ids:
+        batch_allocate_and_store(listing_ids)
+
+# Scheduler job ID of a listing's allocation, one job per listing
+def allocation_job_id(listing_id):
+    return f'allocate-listing-{listing_id}'
+
+# Schedule the allocation of a listing 24 hours before distribution, replacing any
+# job already scheduled for it
+def schedule_listing_allocation(listing_id, distribution_date):
+    execution_time = distribution_date - timedelta(hours=24)
+    scheduler.add_job(genetic_algorithm_and_store, 'date', run_date=execution_time, args=[listing_id],
+                      id=allocation_job_id(listing_id), replace_existing=True,
+                      misfire_grace_time=app.config['ALLOCATION_MISFIRE_GRACE'])
+    logging.info(f"Scheduled job for listing {listing_id} at {execution_time}")
+
+# Move the allocation job when an active listing's distribution date changes. The job
+# store is written once the change is committed, not inside the flush.
+@db.event.listens_for(Listing, 'after_update')
+def track_listing_date_change(mapper, connection, listing):
+    if app.config['ALLOCATION_MODE'] != 'listing' or listing.status != 'active':
+        return
+    state = db.inspect(listing)
+    if state.attrs.distribution_date.history.has_changes():
+        state.session.info.setdefault('rescheduled_listings', {})[listing.id] = listing.distribution_date
+
+@db.event.listens_for(Session, 'after_commit')
+def reschedule_listing_allocations(session):
+    for listing_id, distribution_date in session.info.pop('rescheduled_listings', {}).items():
+        schedule_listing_allocation(listing_id, distribution_date)
+
+@db.event.listens_for(Session, 'after_rollback')
+def discard_listing_reschedules(session):
+    session.info.pop('rescheduled_listings', None)
+
+# Catch up on active listings whose cutoff passed without an allocation (e.g. while the
+# server was down). Jobs that missed their run by more than ALLOCATION_MISFIRE_GRACE are
+# dropped by the scheduler and allocated here instead, oldest cutoff first, at most
+# ALLOCATION_CATCHUP_CONCURRENCY at a time. Returns how many were allocated; the live
+# backlog and lag are reported on /metrics.
+def sweep_missed_allocations():
+    now = datetime.datetime.now()
+    overdue = now + timedelta(hours=24) - timedelta(seconds=app.config['ALLOCATION_MISFIRE_GRACE'])
+    with app.app_context():
+        missed = db.session.query(Listing.id, Listing.distribution_date) \
+            .filter(claimable_listings(now), Listing.distribution_date <= overdue) \
+            .order_by(Listing.distribution_date, Listing.id).all()
+
+    if not missed:
+        return 0
+
+    lag = now - (missed[0].distribution_date - timedelta(hours=24))
+    logging.warning(f"Catching up on {len(missed)} missed allocations, oldest cutoff "
+                    f"{timedelta(seconds=int(lag.total_seconds()))} behind")
+    completed = 0
+    with ThreadPoolExecutor(max_workers=app.config['ALLOCATION_CATCHUP_CONCURRENCY']) as executor:
+        futures = [(listing.id, executor.submit(genetic_algorithm_and_store, listing.id)) for listing in missed]
+        for listing_id, future in futures:
+            try:
+                future.result()
+                completed += 1
+            except Exception:
+                logging.exception(f"Catch-up allocation of listing {listing_id} failed")
+
+    if completed < len(missed):
+        logging.warning(f"Caught up on {completed} of {len(missed)} missed allocations")
+    return completed
+
 # Function to schedule the genetic algorithm for each listing
 def schedule_genetic_algorithm():
+    if app.config['ALLOCATION_MODE'] == 'batch':
+        scheduler.add_job(batch_allocation_job, 'interval', minutes=app.config['BATCH_ALLOCATION_WINDOW'],
+                          id='batch-allocation', replace_existing=True)
+        logging.info(f"Scheduled batch allocation every {app.config['BATCH_ALLOCATION_WINDOW']} minutes")
+        return
+
+    # Sweep for missed allocations right away and then periodically
+    scheduler.add_job(sweep_missed_allocations, 'interval', minutes=app.config['ALLOCATION_CATCHUP_INTERVAL'],
+                      next_run_time=datetime.datetime.now(), id='catch-up-allocations', replace_existing=True,
+                      max_instances=1, coalesce=True)
+
+    # Only active listings still need an allocation, and their job IDs make re-adding them a no-op
     with app.app_context():
-        listings = get_all_listings()
+        listings = db.session.query(Listing.id, Listing.distribution_date).filter(Listing.status == 'active').all()
         for listing in listings:
-            execution_time = listing.distribution_date - timedelta(hours=24)
-            scheduler.add_job(genetic_algorithm_and_store, 'date', run_date=execution_time, args=[listing.id])
-            logging.info(f"Scheduled job for listing {listing.id} at {execution_time}")
+            schedule_listing_allocation(listing.id, listing.distribution_date)
 
 # Schedule the genetic algorithm for each listing when the application starts
 # Background scheduler initialization
@@ -1048,6 +2475,7 @@ def schedule_genetic_algorithm():
     #scheduler.start()
 
 @app.route('/listings/<id>/accepted', methods=['GET'])
+@cached_response('accepted:{id}')
 def get_accepted_listing_users(id):
     # Ensure the genetic algorithm runs and stores results if not already stored
     # accepted_user_ids = genetic_algorithm_and_store(listing_id=id)
@@ -1087,56 +2515,65 @@ def uploaded_file(filename):
     return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
 
 @app.route('/articles', methods=['GET'])
+@cached_response('articles')
 def get_articles():
-    all_articles = Articles.query.order_by(desc(Articles.date)).all()
-    response = []
-    for article in all_articles:
-        picture_url = None
-        if article.picture_url:
-            picture_url = request.host_url + 'uploads/' + article.picture_url
-        
-        response.append({
-            'id': article.id,
-            'title': article.title,
-            'body': article.body,
-            'date': article.date,
-            'user_id': article.user_id,
-            'user_name': article.user.name, 
-            'picture_url': picture_url
-        })
-    return jsonify(response)
+    limit, cursor = page_args()
+    try:
+        # Authors' names come with the articles rather than one query per author
+        all_articles, next_cursor = keyset_page(Articles.query.options(joinedload(Articles.user)),
+                                                Articles.date, Articles.id, limit, cursor, descending=True)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    def response():
+        for article in all_articles:
+            picture_url = None
+            if article.picture_url:
+                picture_url = request.host_url + 'uploads/' + article.picture_url
+            
+            yield {
+                'id': article.id,
+                'title': article.title,
+                'body': article.body,
+                'date': article.date,
+                'user_id': article.user_id,
+                'user_name': article.user.name, 
+                'picture_url': picture_url
+            }
+    return paged_response(response(), next_cursor)
 
-# Retrieve articles filtered by user
+# Retrieve articles filtered by user, read lazily a batch at a time
 def get_articles_by_user(user_id):
-    return Articles.query.filter_by(user_id=user_id).order_by(desc(Articles.date)).all()
+    return Articles.query.filter_by(user_id=user_id).order_by(desc(Articles.date)) \
+        .yield_per(app.config['STREAM_BATCH_SIZE'])
 
 @app.route('/articles/user/<user_id>', methods=['GET'])
 def get_user_articles(user_id):
-    articles = get_articles_by_user(user_id)
+    first, articles = peek(get_articles_by_user(user_id))
 
-    if not articles:
+    if first is None:
         return jsonify({'message': 'No posts found for the user'}), 404
 
-    response = []
-    for article in articles:
-        picture_url = None
-        if article.picture_url:
-            picture_url = request.host_url + 'uploads/' + article.picture_url
-        
+    def response():
+        for article in articles:
+            picture_url = None
+            if article.picture_url:
+                picture_url = request.host_url + 'uploads/' + article.picture_url
+            
 
-        response.append({
-            'id': article.id,
-            'title': article.title,
-            'body': article.body,
-            'date': article.date,
-            'user_id': article.user_id,
-            'picture_url': picture_url
-        })
-    return jsonify(response)
+            yield {
+                'id': article.id,
+                'title': article.title,
+                'body': article.body,
+                'date': article.date,
+                'user_id': article.user_id,
+                'picture_url': picture_url
+            }
+    return paged_response(response(), None)
 
 
 
 @app.route('/articles/<id>/', methods=['GET'])
+@cached_response('article:{id}')
 def post_details(id):
     article = Articles.query.get(id)
 
@@ -1185,6 +2622,7 @@ def create_article():
         picture_url=picture_url
     )
     db.session.add(article)
+    invalidate_responses('articles')
     db.session.commit()
     return jsonify({'message': 'Post created successfully'}), 201
 
@@ -1217,6 +2655,7 @@ def update_article(id):
     if picture_url:
         article.picture_url = picture_url
 
+    invalidate_responses('articles', f'article:{id}')
     db.session.commit()
     return jsonify({'message': 'Post updated successfully'}), 200
 
@@ -1234,6 +2673,7 @@ def article_delete(id):
         confirmation = request.args.get('confirm')
         if confirmation and confirmation.lower() == 'yes':
             db.session.delete(article)
+            invalidate_responses('articles', f'article:{id}')
             db.session.commit()
             return jsonify({'message': 'Post deleted'}), 200
         else:
@@ -1242,9 +2682,36 @@ def article_delete(id):
         return jsonify({'error': str(e)}), 500
 
 
+# Standalone allocation worker: claims due listings from the database and allocates them.
+# Any number of workers on any number of nodes can share the load.
+def run_allocation_worker():
+    concurrency = app.config['ALLOCATION_WORKER_CONCURRENCY']
+    logging.info(f"Allocation worker {WORKER_ID} started with concurrency {concurrency}")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            with app.app_context():
+                listing_ids, token = claim_due_listings(concurrency)
+            if not listing_ids:
+                time.sleep(app.config['ALLOCATION_WORKER_POLL_INTERVAL'])
+                continue
+
+            logging.info(f"Worker {WORKER_ID} claimed listings {listing_ids}")
+            futures = [executor.submit(allocate_claimed_listing, listing_id, token) for listing_id in listing_ids]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    logging.exception("Allocation failed, its lease will expire and be reclaimed")
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    with app.app_context():
-        schedule_genetic_algorithm()
-        scheduler.start()
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # python app.py worker runs an allocation worker instead of the web server
+    if sys.argv[1:] == ['worker']:
+        run_allocation_worker()
+    else:
+        with app.app_context():
+            schedule_genetic_algorithm()
+            scheduler.start()
+        app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,75 @@
+"""Benchmark API latency while listing allocations run.
+
+Closes several listings concurrently with the GA engine, once on scheduler
+threads inside the web process and once in the allocation process pool, and
+measures GET /listings/<id> latency from the test client meanwhile.
+
+    python benchmarks/allocation_backends.py --listings 4 --requesters 3000
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from seed import use_sqlite_database, seed_database  # noqa: E402
+
+
+def measure_latency(client, path, until):
+    latencies = []
+    while not until():
+        started = time.perf_counter()
+        client.get(path)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def summary(latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else float('nan')
+    return f"{len(latencies):>7} {statistics.median(latencies):>8.2f} {p95:>8.2f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, default=4)
+    parser.add_argument('--requesters', type=int, default=3000)
+    parser.add_argument('--generations', type=int, default=200)
+    args = parser.parse_args()
+
+    use_sqlite_database()
+    seeded = seed_database(num_users=args.requesters, num_listings=2 * args.listings,
+                           requests_per_listing=args.requesters)
+
+    import app as server
+    server.app.config.update(ALLOCATION_ENGINE='ga', GA_STALL_GENERATIONS=None, GA_TIME_BUDGET=None,
+                             RESPONSE_CACHE_BACKEND=None)
+    client = server.app.test_client()
+    path = f"/listings/{seeded['listing_ids'][0]}"
+
+    # Start the worker processes before measuring
+    server.get_allocation_pool().submit(time.sleep, 0).result()
+
+    print(f"{'backend':>8} {'requests':>8} {'p50_ms':>8} {'p95_ms':>8} {'alloc_s':>8}")
+    idle_until = time.perf_counter() + 2
+    print(f"{'idle':>8} {summary(measure_latency(client, path, lambda: time.perf_counter() > idle_until))}")
+
+    for round_index, backend in enumerate(('thread', 'process')):
+        server.app.config['ALLOCATION_BACKEND'] = backend
+        listing_ids = seeded['listing_ids'][round_index * args.listings:(round_index + 1) * args.listings]
+        workers = [threading.Thread(target=server.genetic_algorithm_and_store, args=(listing_id, 200, args.generations))
+                   for listing_id in listing_ids]
+
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        latencies = measure_latency(client, path, lambda: not any(worker.is_alive() for worker in workers))
+        elapsed = time.perf_counter() - started
+        print(f"{backend:>8} {summary(latencies)} {elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Benchmark the vectorized haversine kernel against per-pair geodesic calls.
+
+Reports throughput of both, the haversine error relative to the geodesic, and
+how many points each method classifies differently from the geodesic at the
+nearby radius, with and without borderline refinement.
+
+    python benchmarks/distance_kernel.py --points 20000 --radius 5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np  # noqa: E402
+from app import calculate_distance, haversine_km, distances_within  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, default=20000)
+    parser.add_argument('--radius', type=float, default=5)
+    parser.add_argument('--spread-km', type=float, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    origin = (3.139, 101.6869)
+    spread = args.spread_km / 111.0
+    lats = [origin[0] + rng.uniform(-spread, spread) for _ in range(args.points)]
+    lons = [origin[1] + rng.uniform(-spread, spread) for _ in range(args.points)]
+
+    started = time.perf_counter()
+    exact = np.array([calculate_distance(origin, (lat, lon)) for lat, lon in zip(lats, lons)])
+    geodesic_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    approx = haversine_km(origin[0], origin[1], lats, lons)
+    haversine_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    refined, refined_within = distances_within(origin, lats, lons, args.radius, refine=True)
+    refined_seconds = time.perf_counter() - started
+
+    relative_error = np.abs(approx - exact) / exact
+    expected = exact <= args.radius
+    print(f"{'method':>10} {'seconds':>9} {'points/s':>12} {'misclassified':>13}")
+    for method, seconds, within in (('geodesic', geodesic_seconds, expected),
+                                    ('haversine', haversine_seconds, approx <= args.radius),
+                                    ('refined', refined_seconds, refined_within)):
+        print(f"{method:>10} {seconds:>9.4f} {args.points / seconds:>12.0f} {int((within != expected).sum()):>13}")
+    print(f"haversine relative error: max {relative_error.max():.5f}, mean {relative_error.mean():.5f}")
+
+
+if __name__ == '__main__':
+    main()
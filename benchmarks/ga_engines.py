@@ -0,0 +1,50 @@
+"""Benchmark the DEAP allocation GA against the array-backed GA.
+
+Runs both engines on synthetic score tables of increasing size and prints
+wall time and best fitness per engine, next to the exact top-k optimum.
+
+    python benchmarks/ga_engines.py --requesters 1000 5000 --generations 100
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import ScoreTable, allocate  # noqa: E402
+
+
+def synthetic_table(num_requesters, seed=0):
+    rng = random.Random(seed)
+    return ScoreTable(
+        user_ids=list(range(1, num_requesters + 1)),
+        scores=[rng.randint(1, 10) + rng.randint(0, 6) + rng.choice((0, 2, 4)) for _ in range(num_requesters)],
+        request_dates=[None] * num_requesters
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requesters', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--quantity', type=int, default=100)
+    parser.add_argument('--population', type=int, default=100)
+    parser.add_argument('--generations', type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{'requesters':>10} {'engine':>9} {'seconds':>9} {'fitness':>9} {'optimum':>9}")
+    for num_requesters in args.requesters:
+        table = synthetic_table(num_requesters)
+        optimum = allocate(table, args.quantity, 'topk').fitness
+        for engine in ('ga', 'ga_numpy'):
+            started = time.perf_counter()
+            result = allocate(table, args.quantity, engine,
+                              population_size=args.population, max_generations=args.generations, seed=0)
+            elapsed = time.perf_counter() - started
+            print(f"{num_requesters:>10} {engine:>9} {elapsed:>9.3f} {result.fitness:>9.0f} {optimum:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark the island-model GA against a single-population GA.
+
+Runs on a synthetic listing with tens of thousands of requesters. Both runs
+use the same total population and generation count, and the islands evolve
+in the allocation process pool.
+
+    python benchmarks/ga_islands.py --requesters 50000 --quantity 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ga_engines import synthetic_table  # noqa: E402
+import app  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requesters', type=int, default=50000)
+    parser.add_argument('--quantity', type=int, default=5000)
+    parser.add_argument('--population', type=int, default=200)
+    parser.add_argument('--generations', type=int, default=100)
+    parser.add_argument('--islands', type=int, default=4)
+    parser.add_argument('--migration-interval', type=int, default=10)
+    parser.add_argument('--migrants', type=int, default=2)
+    args = parser.parse_args()
+
+    table = synthetic_table(args.requesters)
+    optimum = app.allocate(table, args.quantity, 'topk').fitness
+    pool = app.get_allocation_pool()
+    pool.submit(time.sleep, 0).result()
+
+    runs = [
+        ('single', 'ga', {}),
+        ('islands', 'ga_islands', {'islands': args.islands, 'migration_interval': args.migration_interval,
+                                   'migrants': args.migrants, 'island_map': pool.map}),
+    ]
+    print(f"optimum {optimum}")
+    print(f"{'mode':>8} {'seconds':>9} {'fitness':>9} {'generations':>11}")
+    for mode, engine, options in runs:
+        started = time.perf_counter()
+        result = app.allocate(table, args.quantity, engine, population_size=args.population,
+                              max_generations=args.generations, seed=0, **options)
+        elapsed = time.perf_counter() - started
+        print(f"{mode:>8} {elapsed:>9.2f} {result.fitness:>9.0f} {result.generations:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark generations-to-target fitness with and without greedy seeding.
+
+For each GA engine and seed ratio, reports the first generation whose best
+fitness reaches the target share of the exact top-k optimum.
+
+    python benchmarks/ga_seeding.py --requesters 5000 --target 0.95
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ga_engines import synthetic_table  # noqa: E402
+from app import allocate  # noqa: E402
+
+
+def generations_to_target(history, target):
+    for generation, fitness in enumerate(history):
+        if fitness >= target:
+            return generation
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requesters', type=int, default=5000)
+    parser.add_argument('--quantity', type=int, default=100)
+    parser.add_argument('--population', type=int, default=100)
+    parser.add_argument('--generations', type=int, default=500)
+    parser.add_argument('--target', type=float, default=0.95)
+    parser.add_argument('--seed-ratios', type=float, nargs='+', default=[0, 0.1, 0.2])
+    args = parser.parse_args()
+
+    table = synthetic_table(args.requesters)
+    target = args.target * allocate(table, args.quantity, 'topk').fitness
+
+    print(f"target fitness {target:.0f}")
+    print(f"{'engine':>9} {'seed_ratio':>10} {'to_target':>9} {'seconds':>9} {'fitness':>9}")
+    for engine in ('ga', 'ga_numpy'):
+        for seed_ratio in args.seed_ratios:
+            started = time.perf_counter()
+            result = allocate(table, args.quantity, engine, population_size=args.population,
+                              max_generations=args.generations, seed_ratio=seed_ratio, seed=0)
+            elapsed = time.perf_counter() - started
+            reached = generations_to_target(result.history, target)
+            print(f"{engine:>9} {seed_ratio:>10} {str(reached):>9} {elapsed:>9.3f} {result.fitness:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Check that keyset pagination returns every row exactly once, NULL dates included.
+
+Seeds listings and articles, clears the dates of some of them, then follows
+X-Next-Cursor through /listings, /listings/org/<id> and /articles at several page
+sizes. Exits with status 1 if any walk misses a row, repeats one or fails.
+
+    python benchmarks/keyset_pages.py --limits 1 2 7 100
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from seed import use_sqlite_database, seed_database  # noqa: E402
+
+
+# IDs of every page of a path, following the cursors, and the status that ended the walk
+def walk(client, path, limit):
+    ids = []
+    cursor = None
+    while True:
+        query = {'limit': limit}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get(path, query_string=query)
+        if response.status_code != 200:
+            return ids, response.status_code
+        ids.extend(item['id'] for item in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return ids, 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, default=40)
+    parser.add_argument('--articles', type=int, default=40)
+    parser.add_argument('--limits', type=int, nargs='+', default=[1, 2, 7, 100])
+    args = parser.parse_args()
+
+    use_sqlite_database()
+    seeded = seed_database(num_users=20, num_organizations=2, num_listings=args.listings,
+                           requests_per_listing=0, num_articles=args.articles)
+
+    import app as server
+    from app import db, Listing, Articles
+    server.app.config['RESPONSE_CACHE_BACKEND'] = None
+    client = server.app.test_client()
+
+    with server.app.app_context():
+        # NULL dates at the start, the middle and the end of the ID range
+        for model, column, count in ((Listing, Listing.distribution_date, args.listings),
+                                     (Articles, Articles.date, args.articles)):
+            null_ids = [1, 2, 3, count // 2, count]
+            db.session.execute(model.__table__.update().where(model.id.in_(null_ids)).values({column: None}))
+        db.session.commit()
+
+        organization_id = seeded['organization_ids'][0]
+        expected = {
+            '/listings': {id for id, in db.session.query(Listing.id)},
+            f'/listings/org/{organization_id}': {id for id, in db.session.query(Listing.id)
+                                                 .filter(Listing.organization_id == organization_id)},
+            '/articles': {id for id, in db.session.query(Articles.id)},
+        }
+
+    failures = []
+    for path, ids in expected.items():
+        for limit in args.limits:
+            seen, status = walk(client, path, limit)
+            missing, repeated = ids - set(seen), len(seen) - len(set(seen))
+            print(f"{path} limit={limit}: {len(seen)} rows of {len(ids)}, "
+                  f"{len(missing)} missing, {repeated} repeated, status {status}")
+            if status != 200 or missing or repeated:
+                failures.append((path, limit))
+
+    for path, limit in failures:
+        print(f"paging {path} with limit={limit} did not return every row exactly once")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Check that listing endpoints run a constant number of SQL statements.
+
+Seeds listings across several organizations, then calls each listing endpoint
+at shrinking listing counts and prints the statements each request executed.
+Exits with status 1 if any endpoint's count changes with the number of listings.
+
+    python benchmarks/listing_queries.py --listings 400 100 10
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from seed import use_sqlite_database, seed_database  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--listings', type=int, nargs='+', default=[400, 100, 10])
+    parser.add_argument('--organizations', type=int, default=10)
+    args = parser.parse_args()
+
+    use_sqlite_database()
+    seeded = seed_database(num_users=20, num_organizations=args.organizations,
+                           num_listings=max(args.listings), requests_per_listing=0, num_articles=0)
+
+    import app as server
+    # Listings are deleted behind the response cache's back
+    server.app.config['RESPONSE_CACHE_BACKEND'] = None
+    client = server.app.test_client()
+    paths = ['/listings', '/listings?status=active', f"/listings/org/{seeded['organization_ids'][0]}",
+             f"/listings/nearby/{seeded['user_ids'][0]}", f"/listings/{seeded['listing_ids'][0]}"]
+
+    statements = []
+    with server.app.app_context():
+        server.db.event.listen(server.db.engine, 'before_cursor_execute', lambda *_: statements.append(1))
+
+        counts = {}
+        print(f"{'listings':>8} {'statements':>10} {'ms':>8}  path")
+        for num_listings in sorted(args.listings, reverse=True):
+            server.db.session.execute(server.Listing.__table__.delete().where(server.Listing.id > num_listings))
+            server.db.session.commit()
+            server.refresh_listing_index(force=True)
+
+            for path in paths:
+                del statements[:]
+                started = time.perf_counter()
+                response = client.get(path)
+                # Streamed bodies run their queries as they are read
+                response.get_data()
+                elapsed = (time.perf_counter() - started) * 1000
+                counts.setdefault(path, set()).add(len(statements))
+                print(f"{num_listings:>8} {len(statements):>10} {elapsed:>8.2f}  {path} ({response.status_code})")
+
+    varying = [path for path, seen in counts.items() if len(seen) > 1]
+    for path in varying:
+        print(f"statement count of {path} depends on the number of listings: {sorted(counts[path])}")
+    sys.exit(1 if varying else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Capture query plans and latency of request-table lookups with and without indexes.
+
+Seeds requests, drops the requests indexes and prints the SQLite query plan of
+each access pattern together with endpoint latency, then recreates the indexes
+and prints the same again.
+
+    python benchmarks/request_queries.py --listings 200 --requests-per-listing 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from seed import use_sqlite_database, seed_database  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--listings', type=int, default=200)
+    parser.add_argument('--requests-per-listing', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    use_sqlite_database()
+    seeded = seed_database(num_users=args.users, num_listings=args.listings,
+                           requests_per_listing=args.requests_per_listing, num_articles=0)
+
+    import app as server
+    from app import db, Request
+    client = server.app.test_client()
+
+    with server.app.app_context():
+        listing_id, user_id = db.session.query(Request.listing_id, Request.user_id).first()
+        queries = {
+            'requested listings (user_id, status)': server.listing_rows()
+                .join(Request, Request.listing_id == server.Listing.id)
+                .filter(Request.user_id == user_id, Request.status == 'Pending').order_by(Request.id),
+            'request lookup (listing_id, user_id)': Request.query.filter_by(listing_id=listing_id, user_id=user_id),
+            'pending requesters (listing_id, status)': Request.query.filter_by(listing_id=listing_id, status='Pending'),
+            'last accepted (user_id, status)': db.session.query(Request.user_id, db.func.max(Request.request_date))
+                .filter(Request.status == 'Accepted', Request.user_id.in_(seeded['user_ids'][:100]))
+                .group_by(Request.user_id),
+        }
+        paths = [f'/listings/requested/{user_id}', f'/request/status/{listing_id}/{user_id}']
+        indexes = list(Request.__table__.indexes)
+
+        def report(label):
+            print(f"== {label}")
+            for name, query in queries.items():
+                sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+                plan = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).fetchall()
+                print(f"{name}:")
+                for row in plan:
+                    print(f"    {row[-1]}")
+            for path in paths:
+                client.get(path)
+                latencies = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    client.get(path)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                print(f"{path}: median {statistics.median(latencies):.2f} ms")
+
+        # End the session's transaction so it sees the schema changes
+        db.session.commit()
+        for index in indexes:
+            index.drop(db.engine)
+        report('without requests indexes')
+        for index in indexes:
+            index.create(db.engine)
+        db.session.execute(db.text('ANALYZE'))
+        db.session.commit()
+        report('with requests indexes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Seed a local database with synthetic users, listings, requests and articles.
+
+Rows are written with bulk core inserts so large volumes seed quickly; every
+seeded account shares one precomputed password hash.
+"""
+import datetime
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+# Point the app at a fresh SQLite file unless DATABASE_URL is already set
+def use_sqlite_database():
+    if 'DATABASE_URL' not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix='runrelief-'), 'bench.db')
+        os.environ['DATABASE_URL'] = f'sqlite:///{path}?timeout=30'
+    return os.environ['DATABASE_URL']
+
+
+def seed_database(num_users=100, num_organizations=5, num_listings=20, requests_per_listing=20,
+                  num_articles=20, center=(3.139, 101.6869), spread_km=10, seed=0):
+    from app import (app, db, bcrypt, User, Organization, PublicUser, Listing, Request, Articles,
+                     INCOME_RANGE_SCORES)
+
+    rng = random.Random(seed)
+    spread = spread_km / 111.0
+    now = datetime.datetime.now()
+    password = bcrypt.generate_password_hash('password').decode('utf-8')
+
+    def point():
+        return center[0] + rng.uniform(-spread, spread), center[1] + rng.uniform(-spread, spread)
+
+    with app.app_context():
+        db.create_all()
+
+        organization_ids = list(range(1, num_organizations + 1))
+        user_ids = list(range(num_organizations + 1, num_organizations + num_users + 1))
+
+        db.session.execute(User.__table__.insert(), [
+            {'id': user_id, 'name': f'Organization {user_id}', 'email': f'org{user_id}@example.com',
+             'password': password, 'type': 'organization'}
+            for user_id in organization_ids
+        ] + [
+            {'id': user_id, 'name': f'User {user_id}', 'email': f'user{user_id}@example.com',
+             'password': password, 'type': 'public_user'}
+            for user_id in user_ids
+        ])
+        db.session.execute(Organization.__table__.insert(), [
+            {'id': user_id, 'address': 'Kuala Lumpur', 'telephone_number': '0123456789', 'is_verified': True}
+            for user_id in organization_ids
+        ])
+        public_users = []
+        for user_id in user_ids:
+            lat, lon = point()
+            public_users.append({
+                'id': user_id, 'age': rng.randint(18, 90), 'address': 'Kuala Lumpur',
+                'location_lat': lat, 'location_lon': lon, 'location_name': f'Home {user_id}',
+                'telephone_number': '0123456789', 'num_dependents': rng.randint(0, 6),
+                'income_range': rng.choice(list(INCOME_RANGE_SCORES)),
+                'senior_citizen': rng.random() < 0.2, 'oku_card_holder': rng.random() < 0.1,
+                'is_verified': True
+            })
+        db.session.execute(PublicUser.__table__.insert(), public_users)
+
+        listings = []
+        for listing_id in range(1, num_listings + 1):
+            lat, lon = point()
+            listings.append({
+                'id': listing_id, 'organization_id': rng.choice(organization_ids),
+                'quantity': max(1, requests_per_listing // 4),
+                'distribution_date': now + datetime.timedelta(days=rng.randint(2, 30), minutes=listing_id),
+                'location_lat': lat, 'location_lon': lon, 'location_name': f'Site {listing_id}',
+                'status': 'active', 'resource_type': rng.choice(['Food', 'Water', 'Clothes']),
+                'picture_url': f'listing{listing_id}.jpg'
+            })
+        db.session.execute(Listing.__table__.insert(), listings)
+
+        requests = []
+        for listing in listings:
+            for user_id in rng.sample(user_ids, min(requests_per_listing, len(user_ids))):
+                requests.append({
+                    'listing_id': listing['id'], 'user_id': user_id, 'status': 'Pending',
+                    'request_date': now - datetime.timedelta(minutes=rng.randint(0, 10000))
+                })
+        if requests:
+            db.session.execute(Request.__table__.insert(), requests)
+
+        if num_articles:
+            db.session.execute(Articles.__table__.insert(), [
+                {'title': f'Article {article_id}', 'body': 'Relief update', 'user_id': rng.choice(organization_ids),
+                 'date': now - datetime.timedelta(hours=article_id), 'picture_url': f'article{article_id}.jpg'}
+                for article_id in range(1, num_articles + 1)
+            ])
+
+        db.session.commit()
+
+    return {'organization_ids': organization_ids, 'user_ids': user_ids,
+            'listing_ids': [listing['id'] for listing in listings]}
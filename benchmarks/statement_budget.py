@@ -0,0 +1,188 @@
+"""Check every route's SQL statement count against a declared budget.
+
+Seeds a fresh SQLite database at each scale of the base volumes, calls every
+route through the test client (plus a listing allocation) and records the
+statements executed and wall time of each call. Exits with status 1 if any
+route's statement count exceeds its budget at any scale, which is how a
+per-row query (N+1) shows up as the data grows, or if any route answers with
+another status than the one declared for it.
+
+    python benchmarks/statement_budget.py --scales 1 4 16
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from seed import use_sqlite_database, seed_database  # noqa: E402
+
+
+# (name, statement budget, expected status, method, path, request keyword arguments). Paths
+# are formatted with the seeded IDs; the calls run in this order, writes after reads.
+ROUTES = [
+    ('metrics', 1, 200, 'GET', '/metrics', {}),
+    ('listings', 1, 200, 'GET', '/listings', {}),
+    ('listings by status', 1, 200, 'GET', '/listings?status=active', {}),
+    ('listings page', 1, 200, 'GET', '/listings?limit=10', {}),
+    ('organization listings', 1, 200, 'GET', '/listings/org/{organization_id}', {}),
+    ('nearby listings', 2, 200, 'GET', '/listings/nearby/{user_id}', {}),
+    ('listing', 1, 200, 'GET', '/listings/{listing_id}', {}),
+    ('listing demand', 2, 200, 'GET', '/listings/{listing_id}/demand', {}),
+    ('accepted users', 1, 200, 'GET', '/listings/{allocated_listing_id}/accepted', {}),
+    ('requested listings', 2, 200, 'GET', '/listings/requested/{user_id}', {}),
+    ('request status', 1, 200, 'GET', '/request/status/{listing_id}/{user_id}', {}),
+    ('user', 2, 200, 'GET', '/user/{user_id}', {}),
+    ('public profile', 1, 200, 'GET', '/profile/public_user/{user_id}', {}),
+    ('organization profile', 1, 200, 'GET', '/profile/organization/{organization_id}', {}),
+    ('unverified organizations', 1, 200, 'GET', '/unverified/org', {}),
+    ('unverified public users', 1, 200, 'GET', '/unverified/public', {}),
+    ('articles', 1, 200, 'GET', '/articles', {}),
+    ('articles page', 1, 200, 'GET', '/articles?limit=10', {}),
+    ('user articles', 1, 200, 'GET', '/articles/user/{organization_id}', {}),
+    ('article', 2, 200, 'GET', '/articles/1/', {}),
+    ('login', 1, 200, 'POST', '/login', {'json': {'email': 'user{user_id}@example.com', 'password': 'password'}}),
+    ('register', 3, 201, 'POST', '/register', {'json': {
+        'type': 'public_user', 'name': 'New User', 'email': 'new@example.com', 'password': 'password',
+        'location_lat': 3.139, 'location_lon': 101.6869, 'income_range': 'Below 2500', 'num_dependents': 2,
+        'senior_citizen': False, 'oku_card_holder': False}}),
+    ('update profile', 3, 200, 'PUT', '/profile/public_user/{user_id}/', {'json': {'location_name': 'New Home'}}),
+    ('upload document', 2, 200, 'POST', '/document/public_user/{user_id}', {'files': 'document.pdf'}),
+    ('uploaded file', 0, 200, 'GET', '/uploads/document.pdf', {}),
+    ('verify public user', 1, 200, 'PUT', '/verify/public/{user_id}', {}),
+    ('verify organization', 1, 200, 'PUT', '/verify/org/{organization_id}', {}),
+    ('create listing', 3, 201, 'POST', '/listings', {'data': {
+        'organization_id': '{organization_id}', 'quantity': '5', 'distribution_date': '{distribution_date}',
+        'location_lat': '3.139', 'location_lon': '101.6869', 'location_name': 'New Site', 'resource_type': 'Food'}}),
+    ('request listing', 5, 201, 'POST', '/request/{new_listing_id}', {'json': {'user_id': '{user_id}'}}),
+    ('create article', 1, 201, 'POST', '/createarticles', {'data': {'title': 'New', 'body': 'Update', 'user_id': '{organization_id}'}}),
+    ('update article', 2, 200, 'PUT', '/updatearticles/1/', {'data': {'title': 'Updated'}}),
+    ('delete article', 2, 200, 'DELETE', '/deletearticles/1/?confirm=yes', {}),
+]
+
+# Allocation of a listing with requests, run directly rather than through the scheduler
+ALLOCATION_BUDGET = 10
+ALLOCATION_STATUS = 'ok'
+
+
+def format_arguments(value, ids):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, dict):
+        return {key: format_arguments(item, ids) for key, item in value.items()}
+    return value
+
+
+# Status of a response once its body has been read, streamed bodies run their queries as they are read
+def read_response(response):
+    response.get_data()
+    return response.status_code
+
+
+# Seed one scale and measure every route, printing the results as JSON
+def measure(volumes):
+    # Uploads land in the working directory
+    os.chdir(tempfile.mkdtemp(prefix='runrelief-uploads-'))
+    use_sqlite_database()
+    seeded = seed_database(**volumes)
+
+    import app as server
+    server.app.config.update(ALLOCATION_ENGINE='topk', ALLOCATION_BACKEND='thread')
+    client = server.app.test_client()
+
+    statements = []
+    results = {}
+    with server.app.app_context():
+        # A user and a listing they requested
+        listing_id, user_id = server.db.session.query(server.Request.listing_id, server.Request.user_id) \
+            .order_by(server.Request.id).first()
+        ids = {
+            'organization_id': seeded['organization_ids'][0],
+            'user_id': user_id,
+            'listing_id': listing_id,
+            'allocated_listing_id': seeded['listing_ids'][-1],
+            'new_listing_id': len(seeded['listing_ids']) + 1,
+            'distribution_date': '2099-01-01T00:00:00.000Z',
+        }
+        server.db.event.listen(server.db.engine, 'before_cursor_execute', lambda *_: statements.append(1))
+
+        # Load the spatial indexes up front, they are refreshed on their own schedule
+        server.refresh_listing_index()
+        server.refresh_public_user_index()
+
+        def record(name, call):
+            del statements[:]
+            started = time.perf_counter()
+            status = call()
+            results[name] = {'statements': len(statements), 'ms': (time.perf_counter() - started) * 1000,
+                             'status': status}
+
+        record('allocation', lambda: server.genetic_algorithm_and_store(ids['allocated_listing_id']) and 'ok')
+        for name, _, _, method, path, kwargs in ROUTES:
+            kwargs = format_arguments(kwargs, ids)
+            if 'files' in kwargs:
+                kwargs = {'data': {'file': (io.BytesIO(b'document'), kwargs['files'])}}
+            record(name, lambda: read_response(client.open(path.format(**ids), method=method, **kwargs)))
+
+    print(json.dumps(results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--users', type=int, default=40)
+    parser.add_argument('--organizations', type=int, default=3)
+    parser.add_argument('--listings', type=int, default=10)
+    parser.add_argument('--requests-per-listing', type=int, default=10)
+    parser.add_argument('--articles', type=int, default=10)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(json.loads(args.measure))
+        return
+
+    # Each scale runs in its own process since the app binds its database on import
+    runs = {}
+    for scale in args.scales:
+        volumes = {'num_users': args.users * scale, 'num_organizations': args.organizations * scale,
+                   'num_listings': args.listings * scale, 'requests_per_listing': args.requests_per_listing * scale,
+                   'num_articles': args.articles * scale}
+        env = dict(os.environ)
+        env.pop('DATABASE_URL', None)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', json.dumps(volumes)],
+                                env=env, check=True, capture_output=True, text=True).stdout
+        runs[scale] = json.loads(output.strip().splitlines()[-1])
+
+    budgets = {'allocation': ALLOCATION_BUDGET}
+    budgets.update((name, budget) for name, budget, *_ in ROUTES)
+    expected_statuses = {'allocation': ALLOCATION_STATUS}
+    expected_statuses.update((name, status) for name, _, status, *_ in ROUTES)
+
+    over_budget = []
+    wrong_status = []
+    print(f"{'route':<26} {'budget':>6} " + ' '.join(f"{f'x{scale} stmts':>10} {'ms':>7}" for scale in args.scales))
+    for name, budget in budgets.items():
+        row = [runs[scale][name] for scale in args.scales]
+        print(f"{name:<26} {budget:>6} " + ' '.join(f"{result['statements']:>10} {result['ms']:>7.2f}" for result in row))
+        if any(result['statements'] > budget for result in row):
+            over_budget.append(name)
+        if any(result['status'] != expected_statuses[name] for result in row):
+            wrong_status.append(name)
+
+    for name in over_budget:
+        counts = [runs[scale][name]['statements'] for scale in args.scales]
+        print(f"{name} is over its budget of {budgets[name]} statements: {counts}")
+    for name in wrong_status:
+        statuses = [runs[scale][name]['status'] for scale in args.scales]
+        print(f"{name} answered {statuses} instead of {expected_statuses[name]}")
+    sys.exit(1 if over_budget or wrong_status else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Measure peak memory of large list responses with and without streaming.
+
+Seeds listings and articles, then requests /listings and /articles at shrinking
+row counts with STREAM_LIST_RESPONSES on and off. Bodies are read chunk by chunk
+straight from the WSGI app and discarded, as a server would send them, and the
+peak of Python allocations during each request is reported.
+
+    python benchmarks/streaming_memory.py --rows 20000 5000 1000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from seed import use_sqlite_database, seed_database  # noqa: E402
+
+
+# Peak traced memory, body size and wall time of serving one GET request
+def serve(server, path):
+    from werkzeug.test import EnvironBuilder
+
+    environ = EnvironBuilder(path=path).get_environ()
+    tracemalloc.start()
+    started = time.perf_counter()
+    body = server.app.wsgi_app(environ, lambda status, headers, exc_info=None: None)
+    size = 0
+    try:
+        for chunk in body:
+            size += len(chunk)
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 5000, 1000])
+    args = parser.parse_args()
+
+    use_sqlite_database()
+    seed_database(num_users=20, num_listings=max(args.rows), requests_per_listing=0, num_articles=max(args.rows))
+
+    import app as server
+    server.app.config['RESPONSE_CACHE_BACKEND'] = None
+
+    print(f"{'rows':>7} {'path':<10} {'streamed':>8} {'body_kb':>9} {'peak_kb':>9} {'seconds':>8}")
+    with server.app.app_context():
+        for rows in sorted(args.rows, reverse=True):
+            server.db.session.execute(server.Listing.__table__.delete().where(server.Listing.id > rows))
+            server.db.session.execute(server.Articles.__table__.delete().where(server.Articles.id > rows))
+            server.db.session.commit()
+
+            for path in ('/listings', '/articles'):
+                for streamed in (False, True):
+                    server.app.config['STREAM_LIST_RESPONSES'] = streamed
+                    peak, size, elapsed = serve(server, path)
+                    print(f"{rows:>7} {path:<10} {str(streamed):>8} {size / 1024:>9.0f} {peak / 1024:>9.0f} {elapsed:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,3 @@
+-- Active listings are looked up by status and ordered by distribution date when
+-- scheduling allocations at startup and in batch mode
+CREATE INDEX ix_listings_status_distribution_date ON listings (status, distribution_date);
@@ -0,0 +1,3 @@
+-- Allocation claims: the worker allocating a listing and when its lease expires
+ALTER TABLE listings ADD COLUMN allocation_owner VARCHAR(100) NULL;
+ALTER TABLE listings ADD COLUMN allocation_lease_expires DATETIME NULL;
@@ -0,0 +1,2 @@
+-- Nearby listings are prefiltered by status and a latitude/longitude bounding box
+CREATE INDEX ix_listings_status_location ON listings (status, location_lat, location_lon);
@@ -0,0 +1,4 @@
+-- Keyset pagination of /listings, /listings/org/<id> and /articles walks these orderings
+CREATE INDEX ix_listings_distribution_date_id ON listings (distribution_date, id);
+CREATE INDEX ix_listings_organization_distribution_date ON listings (organization_id, distribution_date, id);
+CREATE INDEX ix_articles_date_id ON articles (date, id);
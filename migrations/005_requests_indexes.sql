@@ -0,0 +1,4 @@
+-- Requests are looked up by (listing_id, user_id), (listing_id, status) and (user_id, status)
+CREATE INDEX ix_requests_listing_user ON requests (listing_id, user_id);
+CREATE INDEX ix_requests_listing_status ON requests (listing_id, status);
+CREATE INDEX ix_requests_user_status ON requests (user_id, status);